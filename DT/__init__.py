@@ -0,0 +1 @@
+from .digitalterminal import DTspider
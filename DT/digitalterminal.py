@@ -3,198 +3,277 @@ import json
 import os
 from scrapy.crawler import CrawlerProcess
 from scrapy.exceptions import IgnoreRequest
-from collections import Counter
+from scrapy.utils.defer import maybe_deferred_to_future
 import logging
-from selenium import webdriver
+import sys
+from twisted.internet import reactor
+from twisted.internet.threads import deferToThreadPool
+from twisted.python.threadpool import ThreadPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.settings import SPIDER_SETTINGS
+from common.metrics import SpiderMetrics
+from common.driver_pool import WebDriverPool
+from common.extraction import get_extractor
+from common.feeds import FEED_ERRORS, FEEDS, feed_requests, follow_feed
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
+from urllib.parse import urlparse
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
 
 
 class DTspider(scrapy.Spider):
     name = "dt_spider"
+    custom_settings = SPIDER_SETTINGS
     
-    def __init__(self, urls=None, max_read_more=2, *args, **kwargs):
+    def __init__(self, urls=None, max_read_more=2, driver_pool_size=2, driver_max_uses=20,
+                 discovery='browser', page_size=10, feed_urls=None, *args, **kwargs):
         super(DTspider, self).__init__(*args, **kwargs)
         self.start_urls = urls if urls else []
         self.output_file = 'DT.json'
         self.stats_file = 'dt_spider_stats.json'
         self.max_read_more = int(max_read_more)  # Convert to int in case it's passed as a string
-        self.stats = {
-            'total_baseURL': 0,
-            'total_requests': 0,
-            'successful_baseURL': 0,
-            'failed_baseURL': 0,
-            'successful_requests': 0,
-            'failed_requests': 0,
-            'articles_scraped': 0,
-            'read_more_clicks': 0,
-            'response_codes': Counter(),
-            'errors': []
-        }
+        # 'browser' clicks "Read More" in Chrome, 'api' pages the Quintype collection API,
+        # 'feeds' reads the news sitemap instead of any listing page
+        self.discovery = discovery
+        self.page_size = int(page_size)
+        self.feed_urls = feed_urls or FEEDS['digitalterminal.in']
+        # Selectors come from the per-site registry in common/extraction.py
+        self.extractor = get_extractor('digitalterminal.in')
+        self.metrics = SpiderMetrics(extra=('read_more_clicks',))
         self.chrome_options = Options()
         self.chrome_options.add_argument("--headless")
         # chrome_options.add_argument("--start-maximized")
-        self.driver = None
+        # Browsers are launched once and leased per listing page
+        self.driver_pool = WebDriverPool(
+            self.chrome_options,
+            size=int(driver_pool_size),
+            max_uses=int(driver_max_uses),
+            logger=self.logger,
+        )
+        self.render_pool = None
         self.current_base_url = None
         self.articles_to_parse = 0
         self.articles_parsed = 0
-        # self.driver = webdriver.Chrome(options=chrome_options)
-
-        # Create an empty list in the file if it doesn't exist
-        if not os.path.exists(self.output_file):
-            with open(self.output_file, 'w') as f:
-                json.dump([], f)
 
     def start_requests(self):
+        if self.discovery == 'feeds':
+            yield from feed_requests(self.feed_urls, self.parse_feed, self.errback_httpbin)
+            return
         for url in self.start_urls:
-            yield scrapy.Request(url, callback=self.parse, errback=self.errback_httpbin)
+            if self.discovery == 'api':
+                yield self.collection_request(url, offset=0)
+            else:
+                yield scrapy.Request(url, callback=self.parse, errback=self.errback_httpbin)
 
-    def scroll_to_bottom(self, wait_time=1):
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(wait_time)  # Wait for any dynamic content to load
+    def listing_requests(self):
+        # Fallback when a news sitemap is unusable: page the sections through
+        # the collection API, which needs no browser. Repeats from several bad
+        # sitemaps are dropped by the dupefilter.
+        for url in self.start_urls:
+            yield self.collection_request(url, offset=0)
 
+    def collection_request(self, section_url, offset):
+        # digitalterminal.in is a Quintype site; "Read More" fetches the next
+        # slice of the section's collection from this endpoint
+        parsed = urlparse(section_url)
+        slug = parsed.path.strip('/') or 'home'
+        api_url = (f"{parsed.scheme}://{parsed.netloc}/api/v1/collections/{slug}"
+                   f"?item-type=story&offset={offset}&limit={self.page_size}")
+        return scrapy.Request(
+            api_url,
+            callback=self.parse_collection,
+            errback=self.errback_httpbin,
+            meta={'section_url': section_url, 'offset': offset},
+        )
 
-    def parse(self, response):
-        self.stats['total_baseURL'] += 1
-        self.stats['response_codes'][str(response.status)] += 1
-        self.driver = webdriver.Chrome(options=self.chrome_options)
-        self.current_base_url = response.meta.get('url')
+    def parse_collection(self, response):
+        if response.meta.get('not_modified'):
+            # Listing unchanged since it was cached (HTTP 304); nothing new to follow
+            self.logger.info(f"Listing not modified, skipping: {response.url}")
+            return
+        self.metrics.inc('total_baseURL')
+        self.metrics.status(response.status)
+        section_url = response.meta['section_url']
+        offset = response.meta['offset']
 
-        if response.status == 200:
-            self.stats['successful_baseURL'] += 1
-            self.driver.get(response.url)
+        if response.status != 200:
+            self.metrics.inc('failed_baseURL')
+            self.logger.error(f"Failed to fetch collection: {response.url} with status code: {response.status}")
+            return
 
-            try:
-                self.logger.info("Scrolling to the bottom of the page...")
-                self.scroll_to_bottom()
-                self.logger.info("Finished scrolling to the bottom of the page")
+        try:
+            items = json.loads(response.text).get('items', [])
+        except ValueError as e:
+            self.metrics.inc('failed_baseURL')
+            self.logger.error(f"Invalid collection JSON: {response.url}. Error: {str(e)}")
+            self.metrics.error(f"Invalid collection JSON: {response.url}. Error: {str(e)}", type(e).__name__)
+            return
+        self.metrics.inc('successful_baseURL')
+
+        for item in items:
+            story = item.get('story') if item.get('type') == 'story' else None
+            if not story:
+                continue
+            url = story.get('url') or (story.get('slug') and response.urljoin('/' + story['slug']))
+            if url:
+                yield scrapy.Request(url, callback=self.parse_article)
 
-                while self.stats['read_more_clicks'] < self.max_read_more:
-                    wait = WebDriverWait(self.driver, 10) 
+        # Each further page stands in for one "Read More" click
+        page = offset // self.page_size
+        if len(items) >= self.page_size and page < self.max_read_more:
+            self.metrics.inc('read_more_clicks')
+            yield self.collection_request(section_url, offset + self.page_size)
 
+    def scroll_to_bottom(self, driver, wait_time=1):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(wait_time)  # Wait for any dynamic content to load
+
+
+    def render_listing(self, url):
+        # Runs in a render thread: loads the listing in a leased browser, clicks
+        # "Read More" up to max_read_more times and returns the headline links
+        clicks = 0
+        article_urls = []
+        with self.driver_pool.lease() as driver:
+            driver.get(url)
+
+            self.logger.info("Scrolling to the bottom of the page...")
+            self.scroll_to_bottom(driver)
+            self.logger.info("Finished scrolling to the bottom of the page")
+
+            while clicks < self.max_read_more:
+                try:
+                    read_more_button = WebDriverWait(driver, 10).until(
+                        EC.element_to_be_clickable((By.XPATH, '//div[@data-test-id="load-more"]'))
+                    )
+                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", read_more_button)
                     try:
-                        read_more_button = WebDriverWait(self.driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, '//div[@data-test-id="load-more"]'))
-                        )
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", read_more_button)
-                        # time.sleep(2)  # Wait for scroll to complete
-                        # self.driver.execute_script("arguments[0].scrollIntoView();", read_more_button)
-                        try:
-                            read_more_button.click()
-                        except ElementClickInterceptedException:
-                            # If direct click fails, try JavaScript click
-                            self.driver.execute_script("arguments[0].click();", read_more_button)
-                        
                         read_more_button.click()
-                        time.sleep(2)
-                        self.stats['read_more_clicks'] += 1
-                        
-                    except (TimeoutException, NoSuchElementException):
-                        self.logger.info("No more 'Read More' button found or it's not clickable. Finished loading all articles.")
-                        break
-
-                if self.stats['read_more_clicks'] >= self.max_read_more:
-                    self.logger.info(f"Reached maximum number of 'Read More' clicks ({self.max_read_more})")
-                
-                headlines = self.driver.find_elements(By.XPATH, '//div[@data-test-id="headline"]/a')
-                for headline in headlines:
-                        url = headline.get_attribute('href')
-                        if url:
-                            # print("!1!")
-                            yield scrapy.Request(url, callback=self.parse_article)    
+                    except ElementClickInterceptedException:
+                        # If direct click fails, try JavaScript click
+                        driver.execute_script("arguments[0].click();", read_more_button)
+                    time.sleep(2)
+                    clicks += 1
+
+                except (TimeoutException, NoSuchElementException):
+                    self.logger.info("No more 'Read More' button found or it's not clickable. Finished loading all articles.")
+                    break
+
+            if clicks >= self.max_read_more:
+                self.logger.info(f"Reached maximum number of 'Read More' clicks ({self.max_read_more}) on {url}")
+
+            headlines = driver.find_elements(By.XPATH, '//div[@data-test-id="headline"]/a')
+            for headline in headlines:
+                href = headline.get_attribute('href')
+                if href:
+                    article_urls.append(href)
+        return article_urls, clicks
 
+    def render_in_thread(self, url):
+        if self.render_pool is None:
+            # One render thread per browser so a thread never waits on a lease
+            self.render_pool = ThreadPool(minthreads=0, maxthreads=self.driver_pool.size, name='dt-render')
+            self.render_pool.start()
+        return deferToThreadPool(reactor, self.render_pool, self.render_listing, url)
+
+    async def parse(self, response):
+        if response.meta.get('not_modified'):
+            # Listing unchanged since it was cached (HTTP 304); nothing new to follow
+            self.logger.info(f"Listing not modified, skipping: {response.url}")
+            return
+        self.metrics.inc('total_baseURL')
+        self.metrics.status(response.status)
+        self.current_base_url = response.meta.get('url')
+
+        if response.status == 200:
+            self.metrics.inc('successful_baseURL')
+            # Selenium blocks, so render off the reactor and let article downloads
+            # from other sections carry on meanwhile
+            started = time.monotonic()
+            try:
+                article_urls, clicks = await maybe_deferred_to_future(self.render_in_thread(response.url))
             except Exception as e:
                 self.logger.error(f"Error parsing page: {response.url}. Error: {str(e)}")
-                self.stats['errors'].append(f"Error parsing page: {response.url}. Error: {str(e)}")
-
-           
+                self.metrics.error(f"Error parsing page: {response.url}. Error: {str(e)}", type(e).__name__)
+                return
+            self.metrics.inc('read_more_clicks', clicks)
+            # Includes waiting for a free browser, which is what the crawl pays
+            self.metrics.observe('render', time.monotonic() - started, urlparse(response.url).hostname, 'parse')
 
+            for url in article_urls:
+                yield scrapy.Request(url, callback=self.parse_article)
         else:
-            self.stats['failed_baseURL'] += 1
+            self.metrics.inc('failed_baseURL')
             self.logger.error(f"Failed to parse page: {response.url} with status code: {response.status}")
 
+    def parse_feed(self, response):
+        self.metrics.inc('total_baseURL')
+        self.metrics.status(response.status)
+
+        if response.status != 200:
+            self.metrics.inc('failed_baseURL')
+            self.logger.error(f"Failed to parse feed: {response.url} with status code: {response.status}")
+            yield from self.listing_requests()
+            return
+
+        try:
+            yield from follow_feed(response, self.parse_article, self.parse_feed, self.errback_httpbin)
+        except FEED_ERRORS as e:
+            self.metrics.inc('failed_baseURL')
+            self.logger.error(f"Invalid feed: {response.url}. Error: {str(e)}")
+            self.metrics.error(f"Invalid feed: {response.url}. Error: {str(e)}", type(e).__name__)
+            yield from self.listing_requests()
+            return
+        self.metrics.inc('successful_baseURL')
+
     def parse_article(self, response):
-        self.stats['total_requests'] += 1
-        self.stats['response_codes'][str(response.status)] += 1
+        self.metrics.inc('total_requests')
+        self.metrics.status(response.status)
 
         if response.status == 200:
-            self.stats['successful_requests'] += 1
-            self.stats['articles_scraped'] += 1
-
-            title = response.xpath('//div[@class="arrow-component arr--story-headline story-headline-m_wrapper__1Wey6"]/h1/bdi/text()').get()
-            author_name = response.css('div[data-test-id="author-name"] a::text').get()
-            author_relative_url = response.css('div[data-test-id="author-name"] a::attr(href)').get()
-        
-            # Construct the full URL for the author using response.urljoin()
-            author_url = response.urljoin(author_relative_url) if author_relative_url else None
-            published_date = response.css('time::attr(datetime)').get()
-            article_content = ' '.join(response.css('div[data-test-id="text"] p::text').getall())
+            self.metrics.inc('successful_requests')
+            self.metrics.inc('articles_scraped')
 
             article_data = {
                 "Response Code": response.status,
                 "Article URL": response.url,
-                "Title": title,
-                "Author Name": author_name,
-                "Author URL": author_url,
-                "Article Content": article_content,
-                "Published Date": published_date
+                **self.extractor.extract(response)
             }
-            self.append_to_json_file(article_data)
+            yield article_data
         else:
-            self.stats['failed_requests'] += 1
+            self.metrics.inc('failed_requests')
             self.logger.error(f"Failed to parse article: {response.url} with status code: {response.status}")
 
-    def close_driver(self):
-        if self.driver:
-            self.logger.info(f"Closing WebDriver for URL: {self.current_base_url}")
-            self.driver.quit()
-            self.driver = None
-    
     def errback_httpbin(self, failure):
-        self.stats['failed_requests'] += 1
+        self.metrics.inc('failed_requests')
         if failure.check(IgnoreRequest):
             self.logger.error(f"IgnoreRequest error on {failure.request.url}")
-            self.stats['errors'].append(f"IgnoreRequest error on {failure.request.url}")
+            self.metrics.error(f"IgnoreRequest error on {failure.request.url}", 'IgnoreRequest')
         else:
             self.logger.error(f"Error on {failure.request.url}: {str(failure.value)}")
-            self.stats['errors'].append(f"Error on {failure.request.url}: {str(failure.value)}")
-    
-    def append_to_json_file(self, data):
-        try:
-            with open(self.output_file, 'r+') as file:
-                try:
-                    articles = json.load(file)
-                except json.JSONDecodeError:
-                    articles = []
-                articles.append(data)
-                file.seek(0)
-                json.dump(articles, file, indent=4)
-                file.truncate()
-        except FileNotFoundError:
-            with open(self.output_file, 'w') as file:
-                json.dump([data], file, indent=4)
+            self.metrics.error(f"Error on {failure.request.url}: {str(failure.value)}", failure.type.__name__)
     
     def closed(self, reason):
+        if self.render_pool is not None:
+            self.render_pool.stop()
+        self.driver_pool.close()
 
-        if self.driver:
-            self.close_driver()
-
-        with open(self.stats_file, 'w') as f:
-            json.dump(self.stats, f, indent=4)
+        # The stats file itself is written by common.metrics.SpiderStatsWriter
+        stats = self.metrics.snapshot()
         
         self.logger.info(f"Spider closed: {reason}")
-        self.logger.info(f"Total BaseURLs: {self.stats['total_baseURL']}")
-        self.logger.info(f"Successful BaseURL requests: {self.stats['successful_baseURL']}")
-        self.logger.info(f"Failed BaseURL requests: {self.stats['failed_baseURL']}")
-        self.logger.info(f"Total requests: {self.stats['total_requests']}")
-        self.logger.info(f"Successful requests: {self.stats['successful_requests']}")
-        self.logger.info(f"Failed requests: {self.stats['failed_requests']}")
-        self.logger.info(f"Articles scraped: {self.stats['articles_scraped']}")
-        self.logger.info(f"Response codes: {dict(self.stats['response_codes'])}")
+        self.logger.info(f"Total BaseURLs: {stats['total_baseURL']}")
+        self.logger.info(f"Successful BaseURL requests: {stats['successful_baseURL']}")
+        self.logger.info(f"Failed BaseURL requests: {stats['failed_baseURL']}")
+        self.logger.info(f"Total requests: {stats['total_requests']}")
+        self.logger.info(f"Successful requests: {stats['successful_requests']}")
+        self.logger.info(f"Failed requests: {stats['failed_requests']}")
+        self.logger.info(f"Articles scraped: {stats['articles_scraped']}")
+        self.logger.info(f"Response codes: {stats['response_codes']}")
         
 
 # List of URLs to scrape
@@ -222,6 +301,7 @@ urls_to_scrape = [
     
 ]
 
-process = CrawlerProcess()
-process.crawl(DTspider, urls=urls_to_scrape)
-process.start()
\ No newline at end of file
+if __name__ == '__main__':
+    process = CrawlerProcess()
+    process.crawl(DTspider, urls=urls_to_scrape)
+    process.start()
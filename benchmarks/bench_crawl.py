@@ -0,0 +1,246 @@
+"""End-to-end crawl throughput against a local fixture server, no network.
+
+Listing and article pages for all five publishers are generated from the
+recorded articles (see benchmarks/pages.py) and served by a local Twisted
+server with optional latency and injected 503s. Each spider then crawls it
+in its own process (DT through its collection API), and pages/sec,
+items/sec, CPU time and peak RSS are reported.
+
+    python -m benchmarks.bench_crawl [spider ...] [--latency 0.05] [--error-rate 0.02]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from urllib.parse import urlparse
+
+from benchmarks.pages import OUTPUT_FILES, ROOT, article_html, listing_html, load_articles
+
+COLLECTIONS_PATH = '/api/v1/collections/'
+
+# Every page comes from the fixture server and no state is carried between
+# runs. Politeness delays (livemint's DOWNLOAD_DELAY) and the adaptive
+# throttle with its saved limits would measure the delay, not the code.
+BENCH_SETTINGS = {
+    'HTTPCACHE_ENABLED': False,
+    'SEEN_INDEX_ENABLED': False,
+    'METRICS_ENABLED': False,
+    'TELNETCONSOLE_ENABLED': False,
+    'DOWNLOAD_DELAY': 0,
+    'RANDOMIZE_DOWNLOAD_DELAY': False,
+    'ADAPTIVE_CONCURRENCY_ENABLED': False,
+}
+
+
+def serve(port_queue, latency, jitter, error_rate, per_page, seed):
+    # Runs in its own process so serving never competes with the crawl's reactor
+    sys.path.insert(0, ROOT)
+    from twisted.internet import reactor
+    from twisted.web.resource import Resource
+    from twisted.web.server import NOT_DONE_YET, Site
+
+    from common.pagination import page_number, page_url
+
+    class FixtureResource(Resource):
+        isLeaf = True
+
+        def __init__(self):
+            super().__init__()
+            self.articles = {}
+            for domain in OUTPUT_FILES:
+                try:
+                    self.articles[domain] = load_articles(domain)
+                except (OSError, ValueError):
+                    self.articles[domain] = []
+            self.rendered = {}
+            self.random = random.Random(seed)
+
+        def article(self, domain, path):
+            articles = self.articles[domain]
+            index = zlib.crc32(path.encode()) % len(articles)
+            if (domain, index) not in self.rendered:
+                self.rendered[(domain, index)] = article_html(domain, articles[index]).encode('utf-8')
+            return self.rendered[(domain, index)]
+
+        def page(self, request):
+            base = f"http://{request.getHeader(b'host').decode()}"
+            path = request.path.decode()
+            uri = request.uri.decode()
+
+            if path.startswith(COLLECTIONS_PATH):
+                # Quintype collection API, as used by DTspider's 'api' discovery
+                slug = path[len(COLLECTIONS_PATH):]
+                domain = slug.split('/')[0]
+                offset = int(request.args.get(b'offset', [b'0'])[0])
+                limit = int(request.args.get(b'limit', [b'10'])[0])
+                items = [{'type': 'story', 'story': {'url': f'{base}/{domain}/story/{zlib.crc32(slug.encode()):x}-{offset + i}'}}
+                         for i in range(limit)]
+                return 200, b'application/json', json.dumps({'items': items}).encode('utf-8')
+
+            parts = path.strip('/').split('/')
+            domain = parts[0]
+            if not self.articles.get(domain):
+                return 404, b'text/plain', b'unknown site'
+            if len(parts) > 1 and parts[1] == 'story':
+                return 200, b'text/html; charset=utf-8', self.article(domain, path)
+
+            # Each page of a section links to its own set of articles
+            section = page_url(uri, 0) or uri
+            page = page_number(uri) or 1
+            links = [f'{base}/{domain}/story/{zlib.crc32(section.encode()):x}-{page}-{i}' for i in range(per_page)]
+            return 200, b'text/html; charset=utf-8', listing_html(domain, links).encode('utf-8')
+
+        def render_GET(self, request):
+            status, content_type, body = self.page(request)
+            if error_rate and self.random.random() < error_rate:
+                status, content_type, body = 503, b'text/plain', b'injected error'
+            request.setResponseCode(status)
+            request.setHeader(b'Content-Type', content_type)
+
+            delay = latency * self.random.uniform(1 - jitter, 1 + jitter) if latency else 0
+            if not delay:
+                return body
+            call = reactor.callLater(delay, self.finish, request, body)
+            request.notifyFinish().addErrback(lambda _: call.cancel() if call.active() else None)
+            return NOT_DONE_YET
+
+        @staticmethod
+        def finish(request, body):
+            request.write(body)
+            request.finish()
+
+    listener = reactor.listenTCP(0, Site(FixtureResource()), interface='127.0.0.1')
+    port_queue.put(listener.getHost().port)
+    reactor.run()
+
+
+def local_url(base_url, url):
+    # https://inc42.com/industry/fintech/page/1/ -> <base>/inc42.com/industry/fintech/page/1/
+    parsed = urlparse(url)
+    return f'{base_url}/{parsed.hostname}{parsed.path}' + (f'?{parsed.query}' if parsed.query else '')
+
+
+def run_spider(name, base_url, sections, spider_kwargs, overrides, results):
+    # Runs in a child process, in a scratch directory so the spiders' output,
+    # stats and state files never overwrite the recorded ones
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.mkdtemp(prefix=f'bench-{name}-')
+    os.chdir(workdir)
+
+    from scrapy.crawler import Crawler, CrawlerProcess
+
+    from run import SPIDERS
+
+    spidercls, urls = SPIDERS[name]
+    process = CrawlerProcess({'LOG_LEVEL': 'WARNING'})
+    settings = process.settings.copy()
+    settings.setdict(overrides, priority='cmdline')
+    crawler = Crawler(spidercls, settings, init_reactor=True)
+    process.crawl(crawler, urls=[local_url(base_url, url) for url in urls[:sections]], **spider_kwargs)
+
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    process.start()
+    elapsed = time.perf_counter() - started
+    after = resource.getrusage(resource.RUSAGE_SELF)
+
+    stats = crawler.stats.get_stats()
+    results.put({
+        'spider': name,
+        'pages': stats.get('response_received_count', 0),
+        'items': stats.get('item_scraped_count', 0),
+        'elapsed_s': round(elapsed, 3),
+        'cpu_s': round((after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime), 3),
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': round(after.ru_maxrss / 1024, 1),
+    })
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    from run import SPIDERS
+
+    names = list(SPIDERS)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('spiders', nargs='*', metavar='spider',
+                        help=f"spiders to run: {', '.join(names)} (default: all)")
+    parser.add_argument('--sections', type=int, default=3, help="start URLs (sections) per spider")
+    parser.add_argument('--max-pages', type=int, default=3, help="listing pages per section")
+    parser.add_argument('--per-page', type=int, default=20, help="article links per listing page")
+    parser.add_argument('--concurrency', type=int, default=16, help="CONCURRENT_REQUESTS for each crawl")
+    parser.add_argument('--latency', type=float, default=0.05, help="mean server latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.5, help="latency varies by +/- this fraction")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of responses that are 503s")
+    parser.add_argument('--seed', type=int, default=0, help="seed for latency and error injection")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+    unknown = set(args.spiders) - set(names)
+    if unknown:
+        parser.error(f"unknown spiders: {', '.join(sorted(unknown))}")
+
+    ctx = multiprocessing.get_context('spawn')
+    port_queue = ctx.Queue()
+    server = ctx.Process(
+        target=serve,
+        args=(port_queue, args.latency, args.jitter, args.error_rate, args.per_page, args.seed),
+        name='fixture-server',
+        daemon=True,
+    )
+    server.start()
+    base_url = f'http://127.0.0.1:{port_queue.get(timeout=60)}'
+
+    overrides = dict(BENCH_SETTINGS, CONCURRENT_REQUESTS=args.concurrency,
+                     CONCURRENT_REQUESTS_PER_DOMAIN=args.concurrency)
+    rows = []
+    try:
+        for name in args.spiders or names:
+            if name == 'dt':
+                spider_kwargs = {'discovery': 'api', 'max_read_more': args.max_pages - 1, 'page_size': args.per_page}
+            else:
+                spider_kwargs = {'max_pages': args.max_pages}
+            results = ctx.Queue()
+            worker = ctx.Process(target=run_spider, name=f'bench-{name}',
+                                 args=(name, base_url, args.sections, spider_kwargs, overrides, results))
+            worker.start()
+            row = None
+            while row is None:
+                try:
+                    row = results.get(timeout=1)
+                except queue.Empty:
+                    if not worker.is_alive():
+                        break
+            worker.join()
+            if row is None:
+                print(f"{name}: crawl process exited with code {worker.exitcode}", file=sys.stderr)
+                continue
+            rows.append(row)
+    finally:
+        server.terminate()
+        server.join()
+
+    print(f"{'spider':<12}{'pages':>8}{'items':>8}{'secs':>8}{'pages/s':>10}{'items/s':>10}"
+          f"{'cpu s':>8}{'cpu %':>7}{'rss MB':>8}")
+    for row in rows:
+        elapsed = row['elapsed_s'] or float('inf')
+        row['pages_per_sec'] = round(row['pages'] / elapsed, 1)
+        row['items_per_sec'] = round(row['items'] / elapsed, 1)
+        print(f"{row['spider']:<12}{row['pages']:>8}{row['items']:>8}{row['elapsed_s']:>8.1f}"
+              f"{row['pages_per_sec']:>10.1f}{row['items_per_sec']:>10.1f}{row['cpu_s']:>8.1f}"
+              f"{100 * row['cpu_s'] / elapsed:>6.0f}%{row['peak_rss_mb']:>8.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Per-article extraction time: parsel selectors rebuilt per call vs the
+compiled selector cache used by the spiders.
+
+    python -m benchmarks.bench_selectors [--articles 50] [--repeat 5]
+"""
+import argparse
+import time
+
+from scrapy.http import HtmlResponse
+
+from benchmarks.pages import article_html, load_articles
+from common.extraction import FIELDS, SITES, get_extractor, select
+
+
+def extract_with_parsel(response, config):
+    # What the spiders did before: response.xpath()/css() for every field,
+    # which compiles each expression again on every page
+    article = {}
+    for field in FIELDS:
+        spec = config.get(field)
+        if spec is None:
+            article[field] = None
+            continue
+        kind, expression, mode = spec[:3]
+        selector = response.css(expression) if kind == 'css' else response.xpath(expression)
+        value = select(selector.getall(), mode)
+        article[field] = spec[3](value, response) if len(spec) > 3 else value
+    return article
+
+
+def time_per_article(responses, extract, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for response in responses:
+            extract(response)
+        best = min(best, time.perf_counter() - start)
+    return best / len(responses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=50, help="articles per site")
+    parser.add_argument('--repeat', type=int, default=5, help="timing runs (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'site':<25}{'parsel (us)':>14}{'cached (us)':>14}{'speedup':>10}")
+    for domain, config in SITES.items():
+        responses = []
+        for i, article in enumerate(load_articles(domain, args.articles)):
+            url = f'https://{domain}/story-{i}'
+            response = HtmlResponse(url, body=article_html(domain, article).encode('utf-8'), encoding='utf-8')
+            response.selector  # parse up front, only extraction is timed
+            responses.append(response)
+        if not responses:
+            continue
+
+        extractor = get_extractor(domain)
+        assert extractor.extract(responses[0]) == extract_with_parsel(responses[0], config)
+        before = time_per_article(responses, lambda r: extract_with_parsel(r, config), args.repeat)
+        after = time_per_article(responses, extractor.extract, args.repeat)
+        print(f"{domain:<25}{before * 1e6:>14.1f}{after * 1e6:>14.1f}{before / after:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import html
+import json
+import os
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Articles previously scraped for each site, used to fill the page templates
+OUTPUT_FILES = {
+    'www.economist.com': 'economist.json',
+    'inc42.com': 'inc42.json',
+    'www.livemint.com': 'livemint.json',
+    'www.telegraphindia.com': 'telegraph.json',
+    'digitalterminal.in': 'DT.json',
+}
+
+# Roughly the amount of navigation / script markup around a real story
+BOILERPLATE = ''.join(
+    f'<div class="nav-item-{i}"><a href="/section-{i}">Section {i}</a><span>menu</span></div>'
+    for i in range(300)
+) + '<script>' + 'var x = 1;' * 2000 + '</script>'
+
+
+def load_articles(domain, limit=None):
+    with open(os.path.join(ROOT, OUTPUT_FILES[domain]), 'r', encoding='utf-8') as f:
+        articles = [a for a in json.load(f) if a.get('Response Code') == 200 and a.get('Title')]
+    return articles[:limit] if limit else articles
+
+
+def first(value):
+    if isinstance(value, list):
+        return value[0] if value else ''
+    return value or ''
+
+
+def paragraphs(text, tag='p', attrs=''):
+    sentences = [s.strip() for s in (text or '').split('. ') if s.strip()]
+    return ''.join(f'<{tag}{attrs}>{html.escape(s)}.</{tag}>' for s in sentences)
+
+
+def article_body(domain, article):
+    e = lambda v: html.escape(first(v))
+    title, author, author_url = e(article.get('Title')), e(article.get('Author Name')), e(article.get('Author URL'))
+    date, content = e(article.get('Published Date')), article.get('Article Content')
+    if domain == 'www.economist.com':
+        return (f'<div class="css-b4a1pi"><span class="css-rjcumh">Section</span><span class="css-rjcumh">{title}</span></div>'
+                f'<div class="css-1902i5q"><div class="css-1s3lugw"><a href="{author_url}">{author}</a></div></div>'
+                f'<time>Updated</time><time>{date}</time>'
+                + paragraphs(content, attrs=' data-component="paragraph"'))
+    if domain == 'inc42.com':
+        return (f'<h1 class="entry-title">{title}</h1><a rel="author" href="{author_url}">{author}</a>'
+                f'<div class="date"><span>{date}</span><span>5 min read</span></div>'
+                f'<div class="single-post-content">{paragraphs(content)}</div>')
+    if domain == 'www.livemint.com':
+        return (f'<h1>{title}</h1><div class="storyPage_authorDesc__zPjwo"><a href="{author_url}"><strong>{author}</strong></a></div>'
+                f'<div class="storyPage_date__JS9qJ"><span>{date}</span></div>'
+                f'<div class="storyPage_storyContent__m_MYl">{paragraphs(content)}</div>')
+    if domain == 'www.telegraphindia.com':
+        return (f'<h1>{title}</h1><div class="publishdate mt-32"><strong>{author}</strong>'
+                f' Published {date or "13.09.24"}, 07:18 AM</div>'
+                f'<article id="contentbox">{paragraphs(content)}</article>')
+    if domain == 'digitalterminal.in':
+        author_path = urlparse(author_url).path if author_url else '/author/staff'
+        return (f'<div class="arrow-component arr--story-headline story-headline-m_wrapper__1Wey6"><h1><bdi>{title}</bdi></h1></div>'
+                f'<div data-test-id="author-name"><a href="{author_path}">{author}</a></div>'
+                f'<time datetime="{date}">{date}</time>'
+                f'<div data-test-id="text">{paragraphs(content)}</div>')
+    raise KeyError(domain)
+
+
+def article_html(domain, article):
+    return f'<html><head><title>Story</title></head><body>{BOILERPLATE}{article_body(domain, article)}</body></html>'
+
+
+def listing_html(domain, links):
+    if domain == 'www.economist.com':
+        items = ''.join(f'<h3 class="css-1jzypbl"><a href="{link}">Story</a></h3>' for link in links)
+    elif domain == 'inc42.com':
+        items = ''.join(f'<div class="card-wrapper horizontal-card card_big_4:3 card_43">'
+                        f'<figure class="card-image"><a href="{link}">Story</a></figure></div>' for link in links)
+    elif domain == 'www.livemint.com':
+        items = ''.join(f'<div class="listingNew"><a class="imgSec" href="{link}">Story</a></div>' for link in links)
+    elif domain == 'www.telegraphindia.com':
+        items = '<ul class="storylisting">' + ''.join(f'<li><a href="{link}">Story</a></li>' for link in links) + '</ul>'
+    else:
+        items = ''.join(f'<div data-test-id="headline"><a href="{link}">Story</a></div>' for link in links)
+    return f'<html><body>{BOILERPLATE}{items}</body></html>'
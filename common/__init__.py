@@ -0,0 +1 @@
+from .jsonl_writer import JsonLinesWriter
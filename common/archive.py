@@ -0,0 +1,75 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+
+
+class HtmlArchive:
+    """Content-addressed store of raw response bodies.
+
+    Bodies are gzip-compressed into ``objects/<aa>/<sha256>.gz`` under
+    ``root``, so identical pages are stored once. ``index.sqlite`` maps each
+    URL to its body digest plus what is needed to rebuild the response
+    (status, encoding, spider, fetch time).
+    """
+
+    def __init__(self, root, compresslevel=6, batch_size=100):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.compresslevel = compresslevel
+        self.batch_size = batch_size
+        self.pending = []
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, 'index.sqlite'))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, spider TEXT, digest TEXT NOT NULL, status INTEGER, "
+            "encoding TEXT, fetched_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_spider ON pages (spider)")
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest + '.gz')
+
+    def put(self, url, body, spider=None, status=200, encoding='utf-8'):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.object_path(digest)
+        stored = False
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(body, compresslevel=self.compresslevel))
+            os.replace(tmp_path, path)
+            stored = True
+        self.pending.append((url, spider, digest, status, encoding, time.time()))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return digest, stored
+
+    def __contains__(self, url):
+        if any(row[0] == url for row in self.pending):
+            return True
+        return self.conn.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def get(self, digest):
+        with open(self.object_path(digest), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def pages(self, spider=None):
+        self.flush()
+        query = "SELECT url, spider, digest, status, encoding FROM pages"
+        if spider:
+            return self.conn.execute(query + " WHERE spider = ? ORDER BY url", (spider,)).fetchall()
+        return self.conn.execute(query + " ORDER BY url").fetchall()
+
+    def flush(self):
+        if self.pending:
+            self.conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)", self.pending)
+            self.conn.commit()
+            self.pending = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
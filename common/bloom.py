@@ -0,0 +1,140 @@
+import math
+import mmap
+import os
+import struct
+
+MAGIC = b'SBLOOM01'
+HEADER = struct.Struct('<8sdQdI')  # magic, error_rate, initial_capacity, tightening, layers
+LAYER = struct.Struct('<QdQQI')  # capacity, error_rate, count, bits, hashes
+
+
+class BloomLayer:
+    def __init__(self, capacity, error_rate, bits=None, count=0, data=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = bits or max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hashes = max(1, int(round(self.bits / capacity * math.log(2))))
+        self.count = count
+        self.data = data if data is not None else bytearray((self.bits + 7) // 8)
+
+    def indexes(self, h1, h2):
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hashes)]
+
+    def contains(self, h1, h2):
+        data = self.data
+        for i in self.indexes(h1, h2):
+            if not data[i >> 3] & (1 << (i & 7)):
+                return False
+        return True
+
+    def add(self, h1, h2):
+        data = self.data
+        for i in self.indexes(h1, h2):
+            data[i >> 3] |= 1 << (i & 7)
+        self.count += 1
+
+
+class ScalableBloomFilter:
+    """Scalable Bloom filter keyed by request fingerprints (raw digest bytes).
+
+    Starts with one bit array sized for ``initial_capacity`` items at
+    ``error_rate`` and adds a layer twice as large (with a tighter error rate)
+    whenever the current one fills up, so the overall false-positive rate
+    stays bounded. Snapshots are a small header followed by the raw bit
+    arrays; ``load`` memory-maps them copy-on-write instead of reading them
+    into Python objects.
+    """
+
+    def __init__(self, initial_capacity=1000000, error_rate=0.001, tightening=0.5):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.tightening = tightening
+        self.layers = []
+        self.mmap = None
+        self.add_layer()
+
+    def __len__(self):
+        return sum(layer.count for layer in self.layers)
+
+    def add_layer(self):
+        n = len(self.layers)
+        capacity = self.initial_capacity * (2 ** n)
+        error_rate = self.error_rate * (1 - self.tightening) * (self.tightening ** n)
+        self.layers.append(BloomLayer(capacity, error_rate))
+
+    @staticmethod
+    def hash_pair(fingerprint):
+        # Fingerprints are already uniformly distributed digests; use two
+        # 64-bit slices for double hashing
+        h1 = int.from_bytes(fingerprint[:8], 'little')
+        h2 = int.from_bytes(fingerprint[8:16], 'little') | 1
+        return h1, h2
+
+    def __contains__(self, fingerprint):
+        h1, h2 = self.hash_pair(fingerprint)
+        return any(layer.contains(h1, h2) for layer in self.layers)
+
+    def add(self, fingerprint):
+        """Add a fingerprint; return True if it was (probably) already present."""
+        h1, h2 = self.hash_pair(fingerprint)
+        for layer in self.layers:
+            if layer.contains(h1, h2):
+                return True
+        layer = self.layers[-1]
+        if layer.count >= layer.capacity:
+            self.add_layer()
+            layer = self.layers[-1]
+        layer.add(h1, h2)
+        return False
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.error_rate, self.initial_capacity,
+                                self.tightening, len(self.layers)))
+            for layer in self.layers:
+                f.write(LAYER.pack(layer.capacity, layer.error_rate, layer.count,
+                                   layer.bits, layer.hashes))
+            for layer in self.layers:
+                f.write(layer.data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, error_rate, initial_capacity, tightening, n_layers = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a Bloom filter snapshot")
+
+        bloom = cls.__new__(cls)
+        bloom.initial_capacity = initial_capacity
+        bloom.error_rate = error_rate
+        bloom.tightening = tightening
+        bloom.layers = []
+        bloom.mmap = mm
+
+        view = memoryview(mm)
+        offset = HEADER.size
+        specs = []
+        for _ in range(n_layers):
+            specs.append(LAYER.unpack_from(mm, offset))
+            offset += LAYER.size
+        for capacity, layer_error, count, bits, hashes in specs:
+            size = (bits + 7) // 8
+            layer = BloomLayer(capacity, layer_error, bits=bits, count=count,
+                               data=view[offset:offset + size])
+            layer.hashes = hashes
+            bloom.layers.append(layer)
+            offset += size
+        return bloom
+
+    def close(self):
+        if self.mmap is not None:
+            for layer in self.layers:
+                if isinstance(layer.data, memoryview):
+                    layer.data.release()
+            self.mmap.close()
+            self.mmap = None
@@ -0,0 +1,113 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+
+class WebDriverPool:
+    """Bounded pool of headless Chrome drivers.
+
+    Browsers are launched lazily up to ``size`` and leased out per listing
+    page. Between leases the browser is reset (cookies, storage, blank page)
+    and after ``max_uses`` pages it is quit and replaced on the next lease to
+    cap Chrome's memory growth. ``close`` quits every browser the pool owns.
+    """
+
+    def __init__(self, options, size=2, max_uses=20, logger=None):
+        self.options = options
+        self.size = size
+        self.max_uses = max_uses
+        self.logger = logger
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.uses = {}
+        self.closed = False
+        self.launched = 0
+        self.recycled = 0
+
+    @property
+    def in_use(self):
+        with self.lock:
+            return len(self.uses) - self.idle.qsize()
+
+    def launch(self):
+        driver = webdriver.Chrome(options=self.options)
+        with self.lock:
+            self.uses[driver] = 0
+            self.launched += 1
+        if self.logger:
+            self.logger.info(f"Launched WebDriver ({self.launched} so far, pool size {self.size})")
+        return driver
+
+    def acquire(self, timeout=None):
+        if not self.slots.acquire(timeout=timeout):
+            raise TimeoutError("No WebDriver became available")
+        if self.closed:
+            self.slots.release()
+            raise RuntimeError("WebDriver pool is closed")
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self.launch()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, driver, broken=False):
+        try:
+            with self.lock:
+                self.uses[driver] += 1
+                worn_out = self.uses[driver] >= self.max_uses
+            if broken or worn_out or self.closed:
+                if worn_out:
+                    self.recycled += 1
+                self.quit(driver)
+                return
+            try:
+                self.reset(driver)
+            except WebDriverException:
+                self.quit(driver)
+                return
+            self.idle.put(driver)
+        finally:
+            self.slots.release()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        driver = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def reset(self, driver):
+        driver.delete_all_cookies()
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        driver.get('about:blank')
+
+    def quit(self, driver):
+        with self.lock:
+            self.uses.pop(driver, None)
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            if self.logger:
+                self.logger.warning(f"Error quitting WebDriver: {e}")
+
+    def close(self):
+        self.closed = True
+        with self.lock:
+            drivers = list(self.uses)
+        for driver in drivers:
+            self.quit(driver)
+        if self.logger:
+            self.logger.info(f"Closed WebDriver pool ({self.launched} launched, {self.recycled} recycled)")
@@ -0,0 +1,71 @@
+import logging
+import os
+
+from scrapy.dupefilters import BaseDupeFilter
+from scrapy.utils.job import job_dir
+from scrapy.utils.request import RequestFingerprinter, referer_str
+
+from .bloom import ScalableBloomFilter
+
+
+class BloomDupeFilter(BaseDupeFilter):
+    """Request dupefilter backed by a scalable Bloom filter.
+
+    Drop-in replacement for RFPDupeFilter that stores fingerprints as bits
+    instead of hex strings in a set. Like RFPDupeFilter it only persists
+    when a job directory is configured (``JOBDIR``/requests.bloom) or when
+    ``BLOOM_DUPEFILTER_PATH`` is set (``{spider}`` is replaced by the spider
+    name): the snapshot is memory-mapped on start and rewritten on close.
+    Sizing: BLOOM_DUPEFILTER_CAPACITY, BLOOM_DUPEFILTER_ERROR_RATE.
+    """
+
+    def __init__(self, path=None, capacity=1000000, error_rate=0.001, debug=False, *, fingerprinter=None):
+        self.path = path
+        self.fingerprinter = fingerprinter or RequestFingerprinter()
+        self.logdupes = True
+        self.debug = debug
+        self.logger = logging.getLogger(__name__)
+        if path and os.path.exists(path):
+            self.bloom = ScalableBloomFilter.load(path)
+            self.logger.info(f"Loaded {len(self.bloom)} request fingerprints from {path}")
+        else:
+            self.bloom = ScalableBloomFilter(capacity, error_rate)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = settings.get('BLOOM_DUPEFILTER_PATH')
+        if path:
+            spider = getattr(crawler, 'spider', None)
+            path = path.format(spider=spider.name if spider else crawler.spidercls.name)
+        elif job_dir(settings):
+            path = os.path.join(job_dir(settings), 'requests.bloom')
+        return cls(
+            path,
+            capacity=settings.getint('BLOOM_DUPEFILTER_CAPACITY', 1000000),
+            error_rate=settings.getfloat('BLOOM_DUPEFILTER_ERROR_RATE', 0.001),
+            debug=settings.getbool('DUPEFILTER_DEBUG'),
+            fingerprinter=crawler.request_fingerprinter,
+        )
+
+    def request_seen(self, request):
+        return self.bloom.add(self.fingerprinter.fingerprint(request))
+
+    def close(self, reason):
+        if self.path:
+            self.bloom.save(self.path)
+        self.bloom.close()
+
+    def log(self, request, spider):
+        if self.debug:
+            msg = "Filtered duplicate request: %(request)s (referer: %(referer)s)"
+            args = {"request": request, "referer": referer_str(request)}
+            self.logger.debug(msg, args, extra={"spider": spider})
+        elif self.logdupes:
+            msg = (
+                "Filtered duplicate request: %(request)s"
+                " - no more duplicates will be shown"
+                " (see DUPEFILTER_DEBUG to show all duplicates)"
+            )
+            self.logger.debug(msg, {"request": request}, extra={"spider": spider})
+            self.logdupes = False
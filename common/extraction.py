@@ -0,0 +1,198 @@
+import re
+import time
+
+from scrapy.http import HtmlResponse
+
+from . import profiling
+from .selectors import compile_selector
+from .structured import structured_fields
+
+# Output fields, in the order the spiders have always written them
+FIELDS = ['Title', 'Author Name', 'Author URL', 'Article Content', 'Published Date']
+
+
+def telegraph_date(values, response):
+    # "... 13.09.24, 07:18 AM" -> "13.09.24"
+    text = ' '.join(part.strip() for part in values if part.strip())
+    match = re.search(r'(\d{2}\.\d{2}\.\d{2}), (\d{2}:\d{2} [APM]{2})', text)
+    return match.group(1) if match else None
+
+
+def absolute_url(value, response):
+    return response.urljoin(value) if value else None
+
+
+# One entry per publisher: field -> (selector type, expression, mode[, post-processor]).
+# mode is 'first', 'all', 'join' (' '.join of all matches), 'join_strip'
+# (join the non-blank matches, stripped) or an index into all matches.
+# A post-processor gets the selected value and the response.
+# 'structured' lists embedded JSON sources ('json-ld', 'next-data') tried
+# before the selectors; fields they provide skip the selector entirely but
+# still go through the post-processor. 'structured_ignore' names fields
+# always taken from the selectors: JSON-LD's datePublished is ISO 8601,
+# while economist and livemint have always stored the page's display date.
+SITES = {
+    'www.economist.com': {
+        'structured': ('json-ld',),
+        'structured_ignore': ('Published Date',),
+        'Title': ('css', 'div.css-b4a1pi span.css-rjcumh::text', 1),
+        'Author Name': ('css', 'div.css-1902i5q div.css-1s3lugw a::text', 'all'),
+        'Author URL': ('css', 'div.css-1902i5q div.css-1s3lugw a::attr(href)', 'all'),
+        'Article Content': ('css', 'p[data-component="paragraph"]::text', 'join'),
+        'Published Date': ('css', 'time::text', 1),
+    },
+    'inc42.com': {
+        'Title': ('xpath', '//h1[@class="entry-title"]/text()', 'first'),
+        'Author Name': ('xpath', '//a[@rel="author"]/text()', 'first'),
+        'Author URL': ('xpath', '//a[@rel="author"]/@href', 'first'),
+        'Article Content': ('xpath', '//div[@class="single-post-content"]//p//text()', 'join'),
+        'Published Date': ('xpath', '//div[@class="date"]/span[1]/text()', 'first'),
+    },
+    'www.livemint.com': {
+        'structured': ('json-ld', 'next-data'),
+        'structured_ignore': ('Published Date',),
+        'Title': ('xpath', '//h1/text()', 'first'),
+        'Author Name': ('xpath', '//div[contains(@class, "storyPage_authorDesc__zPjwo")]/a/strong/text()', 'first'),
+        'Author URL': ('xpath', '//div[contains(@class, "storyPage_authorDesc__zPjwo")]/a/@href', 'first'),
+        'Article Content': ('xpath', '//div[@class="storyPage_storyContent__m_MYl"]//p/text()', 'join_strip'),
+        'Published Date': ('xpath', '//div[contains(@class, "storyPage_date__JS9qJ")]//span/text()', 'first'),
+    },
+    'www.telegraphindia.com': {
+        'Title': ('xpath', '//h1/text()', 'first'),
+        'Author Name': ('xpath', '//div[@class="publishdate mt-32"]/strong/text()', 'first'),
+        'Author URL': None,
+        'Article Content': ('xpath', '//article[@id="contentbox"]/p/text()', 'join'),
+        'Published Date': ('xpath', '//div[@class="publishdate mt-32"]/text()', 'all', telegraph_date),
+    },
+    'digitalterminal.in': {
+        'structured': ('json-ld',),
+        'Title': ('xpath', '//div[@class="arrow-component arr--story-headline story-headline-m_wrapper__1Wey6"]/h1/bdi/text()', 'first'),
+        'Author Name': ('css', 'div[data-test-id="author-name"] a::text', 'first'),
+        'Author URL': ('css', 'div[data-test-id="author-name"] a::attr(href)', 'first', absolute_url),
+        'Article Content': ('css', 'div[data-test-id="text"] p::text', 'join'),
+        'Published Date': ('css', 'time::attr(datetime)', 'first'),
+    },
+}
+
+
+def select(values, mode):
+    if mode == 'first':
+        return values[0] if values else None
+    if mode == 'all':
+        return values
+    if mode == 'join':
+        return ' '.join(values)
+    if mode == 'join_strip':
+        return ' '.join(v.strip() for v in values if v.strip())
+    return values[mode] if len(values) > mode else None
+
+
+class ArticleExtractor:
+    """Applies one site's field selectors to an article response.
+
+    Every selector is compiled once through the shared selector cache when
+    the extractor is built, and evaluated directly against the tree parsel
+    has already parsed for the response. Sites with a 'structured' entry
+    first read the article from embedded JSON-LD / __NEXT_DATA__ and only
+    fall back to the selectors for fields missing there (or listed in
+    'structured_ignore').
+
+    While profiling is on (see common/profiling.py) each lookup is timed.
+    """
+
+    def __init__(self, config, domain=None):
+        self.domain = domain
+        self.structured = config.get('structured', ())
+        self.structured_ignore = config.get('structured_ignore', ())
+        self.fields = []
+        # field -> (selector type, expression), to label profiling records
+        self.labels = {}
+        for field in FIELDS:
+            spec = config.get(field)
+            if spec is None:
+                self.fields.append((field, None, None, None))
+                continue
+            kind, expression, mode = spec[:3]
+            post = spec[3] if len(spec) > 3 else None
+            self.labels[field] = (kind, expression)
+            self.fields.append((field, compile_selector(kind, expression), mode, post))
+
+    def extract(self, response):
+        # Already extracted in a worker process (see ExtractionPoolMiddleware)
+        request = response.request
+        if request is not None and 'extracted' in request.meta:
+            return request.meta['extracted']
+
+        profile = profiling.profile
+        if profile is not None:
+            return self.extract_profiled(response, profile)
+
+        root = response.selector.root
+        found = self.structured_fields(root) if self.structured else {}
+        return self.build(response, root, found)
+
+    def extract_profiled(self, response, profile):
+        root = profiling.document_root(response, self.domain)
+        found = {}
+        if self.structured:
+            started = time.perf_counter()
+            found = self.structured_fields(root)
+            profile.record(self.domain, 'structured', ','.join(self.structured), time.perf_counter() - started)
+
+        timed_fields = []
+        for field, xpath, mode, post in self.fields:
+            if xpath is not None and field not in found:
+                xpath = self.timed(xpath, profile, self.labels[field])
+            timed_fields.append((field, xpath, mode, post))
+        return self.build(response, root, found, timed_fields)
+
+    def structured_fields(self, root):
+        found = structured_fields(root, self.structured)
+        for field in self.structured_ignore:
+            found.pop(field, None)
+        return found
+
+    def timed(self, xpath, profile, label):
+        def run(root):
+            started = time.perf_counter()
+            values = xpath(root)
+            profile.record(self.domain, *label, time.perf_counter() - started)
+            return values
+        return run
+
+    def build(self, response, root, found, fields=None):
+        article = {}
+        for field, xpath, mode, post in fields or self.fields:
+            if field in found:
+                value = found[field]
+                if isinstance(value, list) and mode != 'all':
+                    value = value[0]
+                elif mode == 'all' and not isinstance(value, list):
+                    value = [value]
+            elif xpath is None:
+                article[field] = None
+                continue
+            else:
+                value = select(xpath(root), mode)
+            article[field] = post(value, response) if post else value
+        return article
+
+    @staticmethod
+    def empty():
+        return dict.fromkeys(FIELDS)
+
+
+_extractors = {}
+
+
+def get_extractor(domain):
+    if domain not in _extractors:
+        _extractors[domain] = ArticleExtractor(SITES[domain], domain)
+    return _extractors[domain]
+
+
+def extract_from_body(domain, url, body, encoding):
+    # Entry point for extraction worker processes; each worker builds (and
+    # then reuses) its own compiled extractor for the domain
+    response = HtmlResponse(url, body=body, encoding=encoding)
+    return get_extractor(domain).extract(response)
@@ -0,0 +1,38 @@
+from types import MappingProxyType
+
+CHROME_UA = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+             '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+CHROME_116_UA = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                 '(KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36')
+
+# Immutable, pre-encoded header sets, built once and shared by every request.
+# Accept-Encoding is left to HttpCompressionMiddleware so only encodings it
+# can actually decode are advertised.
+HEADER_PROFILES = MappingProxyType({
+    'browser': (
+        (b'User-Agent', CHROME_UA.encode()),
+        (b'Accept', b'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'),
+        (b'Accept-Language', b'en-US,en;q=0.5'),
+        (b'DNT', b'1'),
+        (b'Connection', b'keep-alive'),
+        (b'Upgrade-Insecure-Requests', b'1'),
+    ),
+    # What the standalone livemint crawler (test.py) has always sent
+    'livemint': (
+        (b'User-Agent', CHROME_116_UA.encode()),
+        (b'Accept', b'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8'),
+        (b'Accept-Language', b'en-US,en;q=0.5'),
+        (b'Connection', b'keep-alive'),
+        (b'Referer', b'https://www.livemint.com/'),
+        (b'Upgrade-Insecure-Requests', b'1'),
+    ),
+    'default': (),
+})
+
+DOMAIN_PROFILES = MappingProxyType({
+    'www.economist.com': 'browser',
+    'inc42.com': 'browser',
+    'www.livemint.com': 'browser',
+    'www.telegraphindia.com': 'browser',
+    'digitalterminal.in': 'browser',
+})
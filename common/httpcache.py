@@ -0,0 +1,57 @@
+from time import time
+
+from scrapy.extensions.httpcache import RFC2616Policy, rfc1123_to_epoch
+
+from .utils import is_article_request
+
+
+class ListingRevalidatePolicy(RFC2616Policy):
+    """HTTP cache policy for news sites.
+
+    Listing pages are always revalidated with If-None-Match /
+    If-Modified-Since; when the server answers 304 the cached page is used
+    and ``not_modified`` is set in the request meta so the spider can skip
+    re-parsing it. Article pages are served from the cache indefinitely,
+    unless ``HTTPCACHE_ARTICLE_EXPIRATION_SECS`` is set, the request has
+    ``refresh_cache`` in its meta or its ``lastmod`` (from a feed) is newer
+    than the cached copy. Only 200 article responses are stored or served
+    this way; errors and redirects are always fetched again.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.article_expiration_secs = settings.getint('HTTPCACHE_ARTICLE_EXPIRATION_SECS', 0)
+
+    def should_cache_response(self, response, request):
+        if is_article_request(request):
+            if response.status != 200:
+                return False
+            cc = self._parse_cachecontrol(response)
+            return b"no-store" not in cc
+        return super().should_cache_response(response, request)
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        if request.meta.get('refresh_cache'):
+            return False
+        if is_article_request(request):
+            if cachedresponse.status != 200:
+                # e.g. a 404 or 5xx stored by an earlier version of this policy
+                return False
+            # Feed discovery passes the story's lastmod; refetch if it changed after caching
+            lastmod = request.meta.get('lastmod')
+            cached_at = rfc1123_to_epoch(cachedresponse.headers.get(b"Date"))
+            if lastmod and cached_at and lastmod > cached_at:
+                return False
+            if not self.article_expiration_secs:
+                return True
+            age = self._compute_current_age(cachedresponse, request, time())
+            return age < self.article_expiration_secs
+        # Listing pages: always ask the server, sending the stored validators
+        self._set_conditional_validators(request, cachedresponse)
+        return False
+
+    def is_cached_response_valid(self, cachedresponse, response, request):
+        if response.status == 304:
+            request.meta['not_modified'] = True
+            return True
+        return super().is_cached_response_valid(cachedresponse, response, request)
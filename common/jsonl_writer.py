@@ -0,0 +1,85 @@
+import json
+import os
+import textwrap
+
+
+class JsonLinesWriter:
+    """Append-only JSON Lines writer.
+
+    Every record is one line, so writing an item costs O(1) instead of
+    re-reading and re-dumping the whole output file. Lines are buffered and
+    written in batches. When ``legacy_path`` is given, the old JSON-array file
+    is regenerated from the .jsonl file on close for consumers that still
+    expect it (and is used to seed the .jsonl file on the first run).
+    """
+
+    def __init__(self, path, batch_size=50, legacy_path=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.legacy_path = legacy_path
+        self.buffer = []
+        self.items_written = 0
+
+        if legacy_path and not os.path.exists(path) and os.path.exists(legacy_path):
+            self.import_legacy(legacy_path)
+
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def import_legacy(self, legacy_path):
+        # One-off migration of an existing JSON array file into JSON Lines
+        with open(legacy_path, 'r', encoding='utf-8') as file:
+            try:
+                articles = json.load(file)
+            except json.JSONDecodeError:
+                articles = []
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for article in articles:
+                file.write(json.dumps(article) + '\n')
+
+    def write(self, item):
+        self.buffer.append(json.dumps(item) + '\n')
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, items):
+        for item in items:
+            self.buffer.append(json.dumps(item) + '\n')
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(''.join(self.buffer))
+            self.items_written += len(self.buffer)
+            self.buffer = []
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        if self.legacy_path:
+            self.export_json(self.legacy_path)
+
+    def export_json(self, path):
+        # Stream the .jsonl file into the legacy indented JSON array layout
+        tmp_path = path + '.tmp'
+        with open(self.path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+            dst.write('[')
+            first = True
+            for line in src:
+                line = line.strip()
+                if not line:
+                    continue
+                dst.write('\n' if first else ',\n')
+                dst.write(textwrap.indent(json.dumps(json.loads(line), indent=4), '    '))
+                first = False
+            dst.write('\n]' if not first else ']')
+        os.replace(tmp_path, path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,302 @@
+import json
+import math
+import time
+from collections import deque
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet import task
+
+from .utils import callback_name
+
+COUNTERS = (
+    'total_baseURL',
+    'total_requests',
+    'successful_baseURL',
+    'failed_baseURL',
+    'successful_requests',
+    'failed_requests',
+    'articles_scraped',
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with HDR-style log-linear buckets.
+
+    Buckets run from 0.1 ms up to about 55 minutes with four per doubling, so
+    a recorded value reads back within ~19%; recording is O(1) and the
+    memory is fixed no matter how many values are recorded.
+    """
+
+    base = 0.0001
+    per_doubling = 4
+    size = 4 * 25
+
+    def __init__(self):
+        self.counts = [0] * (self.size + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def bucket(self, seconds):
+        if seconds <= self.base:
+            return 0
+        return min(self.size, math.ceil(math.log2(seconds / self.base) * self.per_doubling))
+
+    def upper_bound(self, bucket):
+        return self.base * 2 ** (bucket / self.per_doubling)
+
+    def record(self, seconds):
+        self.counts[self.bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.min = seconds if self.min is None else min(self.min, seconds)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(self.upper_bound(bucket), self.max)
+        return self.max
+
+    def to_dict(self):
+        ms = lambda seconds: round(seconds * 1000, 3)
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.total / self.count) if self.count else 0.0,
+            'min_ms': ms(self.min or 0.0),
+            'max_ms': ms(self.max),
+            'p50_ms': ms(self.percentile(50)),
+            'p90_ms': ms(self.percentile(90)),
+            'p99_ms': ms(self.percentile(99)),
+            # upper bound of each non-empty bucket (ms) -> count
+            'buckets': {f'{self.upper_bound(b) * 1000:.4g}': c for b, c in enumerate(self.counts) if c},
+        }
+
+
+class SpiderMetrics:
+    """The spiders' counters, kept in the crawler's stats collector.
+
+    Counts live under ``spider/<name>`` keys, response statuses under
+    ``spider/response_codes/<status>`` and error totals under
+    ``spider/errors/<type>``; only the last ``max_errors`` error messages are
+    kept. Until bound to a crawler (and during replay, where there is none)
+    the counts go to a plain dict instead.
+
+    Timings go to histograms per metric, per domain and per callback; see
+    RequestTimings.
+    """
+
+    prefix = 'spider/'
+
+    def __init__(self, extra=(), max_errors=100):
+        self.counters = COUNTERS + tuple(extra)
+        self.stats = None
+        self.spider = None
+        self.local = {}
+        self.recent_errors = deque(maxlen=max_errors)
+        self.histograms = {}
+        # id(item) -> time the callback produced it, while in the item pipelines
+        self.pending_items = {}
+
+    def bind(self, stats, spider, max_errors=None):
+        for key, value in self.local.items():
+            stats.inc_value(self.prefix + key, value, spider=spider)
+        self.local = {}
+        self.stats = stats
+        self.spider = spider
+        if max_errors is not None:
+            self.recent_errors = deque(self.recent_errors, maxlen=max_errors)
+
+    def inc(self, key, count=1):
+        if self.stats is None:
+            self.local[key] = self.local.get(key, 0) + count
+        else:
+            self.stats.inc_value(self.prefix + key, count, spider=self.spider)
+
+    def status(self, status):
+        self.inc(f'response_codes/{status}')
+
+    def error(self, message, kind='Error'):
+        self.inc(f'errors/{kind}')
+        self.recent_errors.append(message)
+
+    def observe(self, metric, seconds, domain=None, callback=None):
+        for kind, name in (('domain', domain), ('callback', callback)):
+            if name:
+                key = (metric, kind, name)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram()
+                histogram.record(seconds)
+
+    def item_started(self, item):
+        self.pending_items[id(item)] = time.perf_counter()
+
+    def item_finished(self, item, domain=None, callback=None):
+        started = self.pending_items.pop(id(item), None)
+        if started is not None:
+            self.observe('item_write', time.perf_counter() - started, domain, callback)
+
+    def histogram_snapshot(self):
+        snapshot = {}
+        for (metric, kind, name), histogram in sorted(self.histograms.items()):
+            snapshot.setdefault(metric, {}).setdefault(kind, {})[name] = histogram.to_dict()
+        return snapshot
+
+    def values(self):
+        if self.stats is None:
+            return dict(self.local)
+        n = len(self.prefix)
+        return {key[n:]: value for key, value in self.stats.get_stats(self.spider).items()
+                if key.startswith(self.prefix)}
+
+    def snapshot(self):
+        """The stats in the layout of the ``*_spider_stats.json`` files."""
+        values = self.values()
+        snapshot = {key: values.get(key, 0) for key in self.counters}
+        snapshot['response_codes'] = self._group(values, 'response_codes/')
+        snapshot['errors'] = list(self.recent_errors)
+        snapshot['error_types'] = self._group(values, 'errors/')
+        return snapshot
+
+    @staticmethod
+    def _group(values, prefix):
+        n = len(prefix)
+        return {key[n:]: value for key, value in values.items() if key.startswith(prefix)}
+
+
+class SpiderStatsWriter:
+    """Bind each spider's metrics to ``crawler.stats`` and write its stats file.
+
+    The file is the spider's ``stats_file``, written when the spider closes.
+    SPIDER_STATS_MAX_ERRORS bounds how many error messages are kept.
+    """
+
+    def __init__(self, crawler, max_errors):
+        self.crawler = crawler
+        self.max_errors = max_errors
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        ext = cls(crawler, crawler.settings.getint('SPIDER_STATS_MAX_ERRORS', 100))
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        metrics = getattr(spider, 'metrics', None)
+        if metrics is not None:
+            metrics.bind(self.crawler.stats, spider, self.max_errors)
+
+    def spider_closed(self, spider, reason):
+        metrics = getattr(spider, 'metrics', None)
+        stats_file = getattr(spider, 'stats_file', None)
+        if metrics is None or not stats_file:
+            return
+        with open(stats_file, 'w') as f:
+            json.dump(metrics.snapshot(), f, indent=4)
+
+
+class RequestTimings:
+    """Record per-request timings into the spiders' latency histograms.
+
+    - ``download``: download latency, from the downloader's ``download_latency``
+    - ``scheduler``: time from being scheduled to reaching the downloader
+    - ``callback_cpu``: reactor-thread CPU time of each callback run, recorded
+      by CallbackTimingMiddleware
+    - ``item_write``: time an item spends in the item pipelines, including
+      waiting for room in the writer queue
+    - ``render``: DT's Selenium rendering of a listing page
+
+    Each is kept per domain and per callback. Items/second is sampled every
+    LATENCY_SAMPLE_INTERVAL seconds. Everything is written to
+    LATENCY_STATS_FILE (``{spider}`` is replaced by the spider name) at close.
+    """
+
+    def __init__(self, crawler, interval=5.0, path='{spider}_latency.json'):
+        self.crawler = crawler
+        self.interval = interval
+        self.path = path
+        self.series = deque(maxlen=10000)
+        self.loop = None
+        self.started = None
+        self.last = (0.0, 0)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('LATENCY_STATS_ENABLED'):
+            raise NotConfigured
+        ext = cls(
+            crawler,
+            interval=settings.getfloat('LATENCY_SAMPLE_INTERVAL', 5.0),
+            path=settings.get('LATENCY_STATS_FILE', '{spider}_latency.json'),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(ext.request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(ext.response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(ext.item_done, signal=signals.item_scraped)
+        crawler.signals.connect(ext.item_done, signal=signals.item_dropped)
+        crawler.signals.connect(ext.item_done, signal=signals.item_error)
+        return ext
+
+    def spider_opened(self, spider):
+        self.started = time.monotonic()
+        self.last = (self.started, 0)
+        self.loop = task.LoopingCall(self.sample)
+        self.loop.start(self.interval, now=False)
+
+    def sample(self):
+        now = time.monotonic()
+        items = self.crawler.stats.get_value('item_scraped_count', 0)
+        last_time, last_items = self.last
+        if now > last_time:
+            self.series.append({
+                'elapsed_s': round(now - self.started, 1),
+                'items_per_sec': round((items - last_items) / (now - last_time), 2),
+            })
+        self.last = (now, items)
+
+    def request_scheduled(self, request, spider):
+        # Wall clock rather than monotonic so it survives a JOBDIR disk queue
+        request.meta['scheduled_at'] = time.time()
+
+    def request_reached_downloader(self, request, spider):
+        scheduled = request.meta.pop('scheduled_at', None)
+        metrics = getattr(spider, 'metrics', None)
+        if scheduled is not None and metrics is not None:
+            metrics.observe('scheduler', time.time() - scheduled,
+                            urlparse_cached(request).hostname, callback_name(request))
+
+    def response_downloaded(self, response, request, spider):
+        latency = request.meta.get('download_latency')
+        metrics = getattr(spider, 'metrics', None)
+        if latency is not None and metrics is not None:
+            metrics.observe('download', latency, urlparse_cached(request).hostname, callback_name(request))
+
+    def item_done(self, item, response, spider, **kwargs):
+        metrics = getattr(spider, 'metrics', None)
+        if metrics is not None:
+            metrics.item_finished(item, urlparse_cached(response).hostname, callback_name(response.request))
+
+    def spider_closed(self, spider):
+        if self.loop is not None and self.loop.running:
+            self.loop.stop()
+            self.sample()
+        metrics = getattr(spider, 'metrics', None)
+        report = {
+            'histograms': metrics.histogram_snapshot() if metrics is not None else {},
+            'items_per_sec': list(self.series),
+        }
+        with open(self.path.format(spider=spider.name), 'w') as f:
+            json.dump(report, f, indent=4)
@@ -0,0 +1,266 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scrapy import Request, signals
+from scrapy.exceptions import NotConfigured
+from scrapy.http import TextResponse
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet import reactor
+from twisted.internet.defer import Deferred
+
+from . import profiling
+from .archive import HtmlArchive
+from .extraction import extract_from_body
+from .headers import DOMAIN_PROFILES, HEADER_PROFILES
+from .seen_index import SeenUrlIndex
+from .utils import callback_name, is_article_request
+
+
+class SeenUrlMiddleware:
+    """Drop article requests whose URL was scraped on a previous run.
+
+    Runs as a spider middleware so already-seen article requests are filtered
+    out of the callback output before they ever reach the scheduler, and
+    article responses that came back 200 are recorded in the index.
+    Settings: SEEN_INDEX_ENABLED, SEEN_INDEX_PATH, SEEN_INDEX_TTL (seconds,
+    0 = never re-fetch). Requests let through because their entry expired
+    get ``refresh_cache`` so they bypass the HTTP cache.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        if not settings.getbool('SEEN_INDEX_ENABLED'):
+            raise NotConfigured
+        self.crawler = crawler
+        self.path = settings.get('SEEN_INDEX_PATH', 'seen_urls.sqlite')
+        self.ttl = settings.getint('SEEN_INDEX_TTL', 0)
+        self.index = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        middleware = cls(crawler)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.index = SeenUrlIndex(self.path, spider.name, ttl=self.ttl)
+        if not len(self.index) and getattr(spider, 'output_file', None):
+            self.index.seed_from_output(spider.output_file)
+        spider.logger.info(f"Seen URL index: {len(self.index)} known articles in {self.path}")
+
+    def spider_closed(self, spider):
+        self.index.close()
+
+    def process_spider_input(self, response, spider):
+        if response.status == 200 and is_article_request(response.request):
+            self.index.add(response.request.url)
+            for url in response.meta.get('redirect_urls', []):
+                self.index.add(url)
+
+    def should_drop(self, result):
+        if isinstance(result, Request) and is_article_request(result):
+            if self.index.is_seen(result.url, result.meta.get('lastmod')):
+                self.crawler.stats.inc_value('seen_index/skipped')
+                return True
+            if self.index.is_expired(result.url):
+                # Re-fetch past the TTL: the HTTP cache keeps articles fresh
+                # forever and would otherwise serve the copy scraped last time
+                result.meta['refresh_cache'] = True
+        return False
+
+    def process_spider_output(self, response, result, spider):
+        for r in result:
+            if not self.should_drop(r):
+                yield r
+
+    async def process_spider_output_async(self, response, result, spider):
+        async for r in result:
+            if not self.should_drop(r):
+                yield r
+
+
+class HeaderProfileMiddleware:
+    """Apply a named header profile to every request, chosen by domain.
+
+    Profiles are the immutable tuples in common/headers.py; domains map to a
+    profile through DOMAIN_PROFILES, extendable with the
+    HEADER_PROFILE_DOMAINS setting. Headers already set on a request win.
+    """
+
+    def __init__(self, domain_profiles):
+        # Resolve names to the shared tuples once, not per request
+        self.profiles = {domain: HEADER_PROFILES[name] for domain, name in domain_profiles.items()}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        domain_profiles = dict(DOMAIN_PROFILES)
+        domain_profiles.update(crawler.settings.getdict('HEADER_PROFILE_DOMAINS'))
+        return cls(domain_profiles)
+
+    def process_request(self, request, spider):
+        profile = self.profiles.get(urlparse_cached(request).hostname)
+        if profile:
+            headers = request.headers
+            for name, value in profile:
+                headers.setdefault(name, value)
+
+
+class ArchiveMiddleware:
+    """Downloader middleware storing every article body in an HtmlArchive.
+
+    Enable with ARCHIVE_ENABLED; bodies go under ARCHIVE_DIR. Responses
+    served from the HTTP cache still pass through process_response, so those
+    (flagged 'cached') are skipped once their URL is in the archive. A cache
+    hit whose URL is missing (cached before ARCHIVE_ENABLED was turned on) is
+    archived the first time it is served.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        if not settings.getbool('ARCHIVE_ENABLED'):
+            raise NotConfigured
+        self.crawler = crawler
+        self.archive = HtmlArchive(settings.get('ARCHIVE_DIR', 'archive'),
+                                   compresslevel=settings.getint('ARCHIVE_COMPRESSLEVEL', 6))
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        middleware = cls(crawler)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def process_response(self, request, response, spider):
+        if response.status == 200 and isinstance(response, TextResponse) and is_article_request(request):
+            if 'cached' in response.flags and response.url in self.archive:
+                return response
+            _, stored = self.archive.put(response.url, response.body, spider=spider.name,
+                                         status=response.status, encoding=response.encoding)
+            self.crawler.stats.inc_value('archive/stored' if stored else 'archive/deduplicated')
+        return response
+
+    def spider_closed(self, spider):
+        self.archive.close()
+
+
+def deferred_from_future(future):
+    # concurrent.futures.Future -> Deferred fired on the reactor thread
+    d = Deferred()
+
+    def done(f):
+        if f.exception() is not None:
+            reactor.callFromThread(d.errback, f.exception())
+        else:
+            reactor.callFromThread(d.callback, f.result())
+
+    future.add_done_callback(done)
+    return d
+
+
+class ExtractionPoolMiddleware:
+    """Extract article fields in a process pool instead of on the reactor.
+
+    Opt-in with EXTRACTION_PROCESSES (number of worker processes). Article
+    bodies are sent to the pool as soon as they are downloaded and the
+    result is stored in ``request.meta['extracted']``, which the spider's
+    extractor returns as-is. If a worker fails, the spider extracts inline
+    as usual.
+    """
+
+    def __init__(self, crawler):
+        self.processes = crawler.settings.getint('EXTRACTION_PROCESSES', 0)
+        if self.processes <= 0:
+            raise NotConfigured
+        self.crawler = crawler
+        self.executor = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        middleware = cls(crawler)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    async def process_response(self, request, response, spider):
+        extractor = getattr(spider, 'extractor', None)
+        if (extractor is None or response.status != 200 or not isinstance(response, TextResponse)
+                or not is_article_request(request)):
+            return response
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.processes,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        future = self.executor.submit(extract_from_body, extractor.domain, response.url,
+                                      response.body, response.encoding)
+        try:
+            request.meta['extracted'] = await maybe_deferred_to_future(deferred_from_future(future))
+            self.crawler.stats.inc_value('extraction_pool/extracted')
+        except Exception as e:
+            spider.logger.warning(f"Pooled extraction failed for {response.url}, extracting inline: {e}")
+            self.crawler.stats.inc_value('extraction_pool/failed')
+        return response
+
+    def spider_closed(self, spider):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class CallbackTimingMiddleware:
+    """Time spider callbacks for RequestTimings (LATENCY_STATS_ENABLED) and
+    the selector profiler (PROFILING_ENABLED).
+
+    Ordered closest to the spider, so the output it wraps comes straight from
+    the callback: each step is timed with reactor-thread CPU time and the
+    total recorded as ``callback_cpu``. Items are stamped on their way to the
+    item pipelines. Async callbacks interleave with other work on the
+    reactor, so only their items are stamped; DT's browser rendering is
+    timed by the spider itself.
+
+    Items are only stamped, and ``callback_cpu`` only recorded, when
+    LATENCY_STATS_ENABLED is set: RequestTimings is what removes the stamps
+    once items leave the pipelines.
+    """
+
+    def __init__(self, latency=True):
+        self.latency = latency
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        latency = settings.getbool('LATENCY_STATS_ENABLED')
+        if not (latency or settings.getbool('PROFILING_ENABLED')):
+            raise NotConfigured
+        return cls(latency)
+
+    def process_spider_output(self, response, result, spider):
+        metrics = getattr(spider, 'metrics', None) if self.latency else None
+        profile = profiling.profile
+        if metrics is None and profile is None:
+            yield from result
+            return
+        result = iter(result)
+        cpu = 0.0
+        while True:
+            start = time.thread_time()
+            try:
+                obj = next(result)
+            except StopIteration:
+                break
+            finally:
+                cpu += time.thread_time() - start
+            if metrics is not None and not isinstance(obj, Request):
+                metrics.item_started(obj)
+            yield obj
+        domain, callback = urlparse_cached(response).hostname, callback_name(response.request)
+        if metrics is not None:
+            metrics.observe('callback_cpu', cpu, domain, callback)
+        if profile is not None:
+            profile.record(domain, 'callback', callback, cpu)
+
+    async def process_spider_output_async(self, response, result, spider):
+        metrics = getattr(spider, 'metrics', None) if self.latency else None
+        async for obj in result:
+            if metrics is not None and not isinstance(obj, Request):
+                metrics.item_started(obj)
+            yield obj
@@ -0,0 +1,180 @@
+import logging
+import os
+import resource
+from numbers import Number
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import reactor
+from twisted.internet.error import CannotListenError
+from twisted.web.resource import Resource
+from twisted.web.server import Site
+
+logger = logging.getLogger(__name__)
+
+# name -> (type, help); families are rendered in this order
+FAMILIES = {
+    'scrapy_stat': ('untyped', 'Numeric values from the crawler stats collector, including the spider/* counters'),
+    'scrapy_scheduler_queue_depth': ('gauge', 'Requests waiting in the scheduler'),
+    'scrapy_engine_in_progress': ('gauge', 'Requests taken from the scheduler and not yet finished'),
+    'scrapy_scraper_active_responses': ('gauge', 'Responses being processed by spider callbacks'),
+    'scrapy_item_pipeline_active': ('gauge', 'Items in the item pipelines'),
+    'scrapy_downloader_in_flight': ('gauge', 'Requests being downloaded, per domain'),
+    'scrapy_downloader_queued': ('gauge', 'Requests waiting for a download slot, per domain'),
+    'scrapy_downloader_concurrency': ('gauge', 'Concurrency limit of the download slot'),
+    'scrapy_downloader_delay_seconds': ('gauge', 'Delay between requests of the download slot'),
+    'webdriver_pool_size': ('gauge', 'Maximum number of WebDrivers in the pool'),
+    'webdriver_pool_in_use': ('gauge', 'WebDrivers currently leased'),
+    'webdriver_pool_launched_total': ('counter', 'WebDrivers launched'),
+    'webdriver_pool_recycled_total': ('counter', 'WebDrivers recycled after max_uses or a failure'),
+    'process_resident_memory_bytes': ('gauge', 'Resident memory of the crawl process'),
+}
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # No procfs: fall back to the peak RSS (kilobytes on Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def collect(crawler):
+    """Yield ``(family, labels, value)`` samples for one crawler."""
+    spider = crawler.spider
+    if spider is None:
+        return
+    name = spider.name
+
+    for key, value in crawler.stats.get_stats(spider).items():
+        if isinstance(value, Number):
+            yield 'scrapy_stat', {'spider': name, 'stat': key}, value
+
+    engine = crawler.engine
+    if engine is None:
+        return
+    if engine.slot is not None:
+        yield 'scrapy_scheduler_queue_depth', {'spider': name}, len(engine.slot.scheduler)
+        yield 'scrapy_engine_in_progress', {'spider': name}, len(engine.slot.inprogress)
+    scraper_slot = engine.scraper.slot
+    if scraper_slot is not None:
+        yield 'scrapy_scraper_active_responses', {'spider': name}, len(scraper_slot.active)
+        yield 'scrapy_item_pipeline_active', {'spider': name}, scraper_slot.itemproc_size
+    for domain, slot in list(engine.downloader.slots.items()):
+        labels = {'spider': name, 'domain': domain}
+        yield 'scrapy_downloader_in_flight', labels, len(slot.transferring)
+        yield 'scrapy_downloader_queued', labels, len(slot.queue)
+        yield 'scrapy_downloader_concurrency', labels, slot.concurrency
+        yield 'scrapy_downloader_delay_seconds', labels, slot.delay
+
+    pool = getattr(spider, 'driver_pool', None)
+    if pool is not None:
+        yield 'webdriver_pool_size', {'spider': name}, pool.size
+        yield 'webdriver_pool_in_use', {'spider': name}, pool.in_use
+        yield 'webdriver_pool_launched_total', {'spider': name}, pool.launched
+        yield 'webdriver_pool_recycled_total', {'spider': name}, pool.recycled
+
+
+def render_metrics(crawlers):
+    samples = {family: [] for family in FAMILIES}
+    for crawler in crawlers:
+        for family, labels, value in collect(crawler):
+            samples[family].append((labels, value))
+    samples['process_resident_memory_bytes'].append(({}, rss_bytes()))
+
+    lines = []
+    for family, (kind, help_text) in FAMILIES.items():
+        if not samples[family]:
+            continue
+        lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {kind}')
+        for labels, value in samples[family]:
+            label_text = ','.join(f'{key}="{escape(val)}"' for key, val in labels.items())
+            lines.append(f'{family}{{{label_text}}} {float(value)!r}' if label_text else f'{family} {float(value)!r}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsResource(Resource):
+    isLeaf = True
+
+    def __init__(self):
+        super().__init__()
+        self.crawlers = []
+
+    def render_GET(self, request):
+        request.setHeader(b'Content-Type', b'text/plain; version=0.0.4; charset=utf-8')
+        return render_metrics(self.crawlers).encode('utf-8')
+
+
+# (host, port) -> (listening port, MetricsResource), shared by all crawlers of the process
+_servers = {}
+
+
+def register(crawler, host, port):
+    if (host, port) not in _servers:
+        metrics = MetricsResource()
+        root = Resource()
+        root.putChild(b'metrics', metrics)
+        listener = reactor.listenTCP(port, Site(root), interface=host)
+        _servers[(host, port)] = (listener, metrics)
+        logger.info(f"Serving Prometheus metrics on http://{host}:{port}/metrics")
+    _servers[(host, port)][1].crawlers.append(crawler)
+
+
+def unregister(crawler, host, port):
+    server = _servers.get((host, port))
+    if server is None:
+        return
+    listener, metrics = server
+    if crawler in metrics.crawlers:
+        metrics.crawlers.remove(crawler)
+    if not metrics.crawlers:
+        del _servers[(host, port)]
+        return listener.stopListening()
+
+
+class MetricsEndpoint:
+    """Serve live crawl metrics in Prometheus text format on localhost.
+
+    All crawlers of a process share one server on METRICS_HOST:METRICS_PORT,
+    at ``/metrics``; it stops when the last of them closes. Exposes the
+    stats collector values (including the spiders' ``spider/*`` counters),
+    scheduler and downloader queue depths, in-flight requests per domain,
+    WebDriver pool usage and the process RSS.
+    """
+
+    def __init__(self, crawler, host='127.0.0.1', port=9410):
+        self.crawler = crawler
+        self.host = host
+        self.port = port
+        self.registered = False
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('METRICS_ENABLED'):
+            raise NotConfigured
+        ext = cls(crawler, host=settings.get('METRICS_HOST', '127.0.0.1'),
+                  port=settings.getint('METRICS_PORT', 9410))
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        try:
+            register(self.crawler, self.host, self.port)
+        except CannotListenError as e:
+            # Metrics are best effort; never fail a crawl over a busy port
+            spider.logger.error(f"Metrics endpoint disabled: {e}")
+            return
+        self.registered = True
+
+    def spider_closed(self, spider):
+        if self.registered:
+            self.registered = False
+            return unregister(self.crawler, self.host, self.port)
@@ -0,0 +1,145 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+from twisted.internet import reactor
+from twisted.internet.threads import deferToThreadPool
+from twisted.python.threadpool import ThreadPool
+
+from .jsonl_writer import JsonLinesWriter
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedWriterPipeline:
+    """Queue scraped items and write them to disk from a dedicated thread.
+
+    Items are written to ``<spider.output_file>.jsonl`` in batches of
+    ``WRITER_BATCH_SIZE`` or every ``WRITER_FLUSH_INTERVAL`` seconds,
+    whichever comes first, so the reactor never touches the output file.
+    When the queue (``WRITER_QUEUE_SIZE``) is full the item is handed to a
+    dedicated one-thread pool to wait for room, which stalls the scraper slot
+    instead of the reactor; the reactor's shared pool (used for DNS lookups)
+    is never blocked by a slow disk. ``close_spider`` drains the queue before
+    returning.
+
+    A batch that fails to write (an item that can't be serialised, a disk
+    error) is logged and the writer carries on, so the queue never backs up
+    behind a dead thread. The first error is kept and raised from every
+    later ``process_item`` and from ``close_spider``.
+    """
+
+    _stop = object()
+
+    def __init__(self, batch_size=100, flush_interval=2.0, queue_size=1000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.writer = None
+        self.thread = None
+        self.wait_pool = None
+        self.error = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            batch_size=settings.getint('WRITER_BATCH_SIZE', 100),
+            flush_interval=settings.getfloat('WRITER_FLUSH_INTERVAL', 2.0),
+            queue_size=settings.getint('WRITER_QUEUE_SIZE', 1000),
+        )
+
+    def open_spider(self, spider):
+        legacy_path = spider.output_file
+        jsonl_path = os.path.splitext(legacy_path)[0] + '.jsonl'
+        self.writer = JsonLinesWriter(jsonl_path, batch_size=self.batch_size, legacy_path=legacy_path)
+        self.thread = threading.Thread(target=self.run_writer, name=f'{spider.name}-writer', daemon=True)
+        self.thread.start()
+        # One thread: waiting items are put in order, and the final drain
+        # queues up behind them
+        self.wait_pool = ThreadPool(minthreads=0, maxthreads=1, name=f'{spider.name}-writer-wait')
+        self.wait_pool.start()
+
+    def process_item(self, item, spider):
+        if self.error is not None:
+            raise self.error
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Backpressure: wait for room off the reactor thread
+            d = deferToThreadPool(reactor, self.wait_pool, self.queue.put, item)
+            d.addCallback(lambda _: item)
+            return d
+        return item
+
+    def run_writer(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(deadline - time.monotonic(), 0)
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._stop:
+                break
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self.write_batch(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+        if batch:
+            self.write_batch(batch)
+        try:
+            self.writer.close()
+        except Exception as e:
+            logger.exception(f"Failed to close {self.writer.path}")
+            self.error = self.error or e
+
+    def write_batch(self, batch):
+        try:
+            self.writer.write_many([dict(item) for item in batch])
+            self.writer.flush()
+        except Exception as e:
+            logger.exception(f"Failed to write {len(batch)} items to {self.writer.path}")
+            self.error = self.error or e
+
+    def drain(self):
+        self.queue.put(self._stop)
+        self.thread.join()
+
+    def close_spider(self, spider):
+        d = deferToThreadPool(reactor, self.wait_pool, self.drain)
+        d.addCallback(lambda _: self.report(spider))
+        d.addBoth(self.stop_wait_pool)
+        return d
+
+    def report(self, spider):
+        if self.error is not None:
+            raise self.error
+        spider.logger.info(f"Wrote {self.writer.items_written} items to {self.writer.path}")
+
+    def stop_wait_pool(self, result):
+        self.wait_pool.stop()
+        return result
+
+
+class QueueSinkPipeline:
+    """Forward items to a ``multiprocessing`` queue given as the spider's
+    ``item_sink`` argument, so a parent process can collect the items of
+    several crawler processes into one output."""
+
+    def open_spider(self, spider):
+        self.sink = getattr(spider, 'item_sink', None)
+
+    def process_item(self, item, spider):
+        if self.sink is not None:
+            self.sink.put((spider.name, dict(item)))
+        return item
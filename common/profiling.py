@@ -0,0 +1,133 @@
+import json
+import logging
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.httpobj import urlparse_cached
+
+logger = logging.getLogger(__name__)
+
+
+class SelectorProfile:
+    """Calls, total and worst time per ``(domain, kind, expression)``.
+
+    ``kind`` is 'xpath' or 'css' for selectors, 'structured' for the embedded
+    JSON lookup, 'document' for parsing the HTML and 'callback' for spider
+    callbacks (reactor-thread CPU time).
+    """
+
+    def __init__(self):
+        self.costs = {}
+
+    def record(self, domain, kind, expression, seconds):
+        key = (domain, kind, expression)
+        cost = self.costs.get(key)
+        if cost is None:
+            cost = self.costs[key] = [0, 0.0, 0.0]
+        cost[0] += 1
+        cost[1] += seconds
+        if seconds > cost[2]:
+            cost[2] = seconds
+
+    def ranked(self, domains=None):
+        rows = [
+            {
+                'domain': domain,
+                'kind': kind,
+                'expression': expression,
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'mean_us': round(total / calls * 1e6, 1),
+                'max_ms': round(worst * 1000, 3),
+            }
+            for (domain, kind, expression), (calls, total, worst) in self.costs.items()
+            if domains is None or domain in domains
+        ]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+
+# The active profile while any crawler has PROFILING_ENABLED, else None. The
+# selector helpers and ArticleExtractor only check this, so profiling costs
+# one attribute lookup per evaluation when it is off.
+profile = None
+_users = 0
+
+
+def start():
+    global profile, _users
+    if profile is None:
+        profile = SelectorProfile()
+    _users += 1
+    return profile
+
+
+def stop():
+    global profile, _users
+    _users -= 1
+    if _users <= 0:
+        profile, _users = None, 0
+
+
+def document_root(response, domain=None):
+    """``response.selector.root``, timing the HTML parse the first time."""
+    if getattr(response, '_cached_selector', None) is not None or profile is None:
+        return response.selector.root
+    started = time.perf_counter()
+    root = response.selector.root
+    profile.record(domain or urlparse_cached(response).hostname, 'document', 'parse', time.perf_counter() - started)
+    return root
+
+
+def timed(response, kind, expression, compiled):
+    domain = urlparse_cached(response).hostname
+    root = document_root(response, domain)
+    started = time.perf_counter()
+    values = compiled(root)
+    if profile is not None:
+        profile.record(domain, kind, expression, time.perf_counter() - started)
+    return values
+
+
+class SelectorProfiler:
+    """Opt-in (PROFILING_ENABLED) profiling of selectors and callbacks.
+
+    Times every selector evaluated through common.selectors and the
+    ArticleExtractor, the embedded-JSON lookup, the HTML parse and (through
+    CallbackTimingMiddleware) each callback. At close, writes the ranking by
+    total time for the domains this crawler fetched to PROFILING_REPORT_FILE
+    (``{spider}`` is replaced by the spider name) and logs the top entries.
+    Extraction done in worker processes (EXTRACTION_PROCESSES) is not seen.
+    """
+
+    def __init__(self, path='{spider}_profile.json', top=10):
+        self.path = path
+        self.top = top
+        self.domains = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('PROFILING_ENABLED'):
+            raise NotConfigured
+        ext = cls(path=settings.get('PROFILING_REPORT_FILE', '{spider}_profile.json'),
+                  top=settings.getint('PROFILING_REPORT_TOP', 10))
+        start()
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def response_received(self, response, request, spider):
+        self.domains.add(urlparse_cached(response).hostname)
+
+    def spider_closed(self, spider):
+        rows = profile.ranked(self.domains) if profile is not None else []
+        stop()
+        with open(self.path.format(spider=spider.name), 'w') as f:
+            json.dump(rows, f, indent=4)
+        for row in rows[:self.top]:
+            spider.logger.info(
+                f"{row['total_ms']:>10.1f} ms {row['calls']:>7} calls  "
+                f"{row['domain']} {row['kind']} {row['expression']}"
+            )
@@ -0,0 +1,31 @@
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+from .archive import HtmlArchive
+
+
+def load_response(archive, url, digest, status, encoding, callback=None):
+    # Rebuild the response the spider originally received from the archive
+    body = archive.get(digest)
+    request = Request(url, callback=callback)
+    return HtmlResponse(url, status=status, body=body, encoding=encoding or 'utf-8', request=request)
+
+
+def replay_chunk(spidercls, archive_dir, rows):
+    """Run ``spidercls.parse_article`` over archived pages, without network.
+
+    Meant to run in a worker process; returns the scraped items and the
+    spider's stats snapshot for this chunk.
+    """
+    spider = spidercls()
+    archive = HtmlArchive(archive_dir)
+    items = []
+    try:
+        for url, _, digest, status, encoding in rows:
+            response = load_response(archive, url, digest, status, encoding, callback=spider.parse_article)
+            for result in spider.parse_article(response) or ():
+                if not isinstance(result, Request):
+                    items.append(dict(result))
+    finally:
+        archive.close()
+    return items, spider.metrics.snapshot()
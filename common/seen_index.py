@@ -0,0 +1,92 @@
+import json
+import os
+import sqlite3
+import time
+
+from .utils import url_fingerprint
+
+
+class SeenUrlIndex:
+    """Persistent index of article URLs a spider has already scraped.
+
+    Rows live in a SQLite table keyed by URL fingerprint and are loaded into
+    a dict when the spider opens, so lookups never touch the disk. New rows
+    are written in batches. With a ``ttl`` (seconds) an entry older than the
+    TTL no longer counts as seen, so updated stories get re-fetched.
+    """
+
+    def __init__(self, path, spider_name, ttl=0, batch_size=200):
+        self.path = path
+        self.spider_name = spider_name
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.pending = []
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "fingerprint TEXT NOT NULL, spider TEXT NOT NULL, url TEXT, scraped_at REAL, "
+            "PRIMARY KEY (spider, fingerprint))"
+        )
+        rows = self.conn.execute(
+            "SELECT fingerprint, scraped_at FROM seen WHERE spider = ?", (spider_name,))
+        self.seen = dict(rows)
+
+    def __len__(self):
+        return len(self.seen)
+
+    def __contains__(self, url):
+        return self.is_seen(url)
+
+    def is_seen(self, url, lastmod=None):
+        scraped_at = self.seen.get(url_fingerprint(url))
+        if scraped_at is None:
+            return False
+        if self.ttl and time.time() - scraped_at > self.ttl:
+            return False
+        if lastmod is not None and lastmod > scraped_at:
+            return False
+        return True
+
+    def is_expired(self, url):
+        # Scraped before, but longer ago than the TTL
+        scraped_at = self.seen.get(url_fingerprint(url))
+        return bool(scraped_at is not None and self.ttl and time.time() - scraped_at > self.ttl)
+
+    def add(self, url, scraped_at=None):
+        fingerprint = url_fingerprint(url)
+        scraped_at = scraped_at or time.time()
+        self.seen[fingerprint] = scraped_at
+        self.pending.append((fingerprint, self.spider_name, url, scraped_at))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def seed_from_output(self, output_file):
+        # First run against an existing output file: treat its articles as seen
+        jsonl_path = os.path.splitext(output_file)[0] + '.jsonl'
+        if os.path.exists(jsonl_path):
+            with open(jsonl_path, 'r', encoding='utf-8') as file:
+                articles = (json.loads(line) for line in file if line.strip())
+                self._seed(articles, os.path.getmtime(jsonl_path))
+        elif os.path.exists(output_file):
+            with open(output_file, 'r', encoding='utf-8') as file:
+                try:
+                    articles = json.load(file)
+                except json.JSONDecodeError:
+                    articles = []
+            self._seed(articles, os.path.getmtime(output_file))
+
+    def _seed(self, articles, scraped_at):
+        for article in articles:
+            if article.get('Response Code') == 200 and article.get('Article URL'):
+                self.add(article['Article URL'], scraped_at)
+        self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.conn.executemany("INSERT OR REPLACE INTO seen VALUES (?, ?, ?, ?)", self.pending)
+            self.conn.commit()
+            self.pending = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+from lxml import etree
+from parsel.csstranslator import css2xpath
+
+from . import profiling
+
+# Distinct expressions used by the spiders number in the dozens; the bound
+# only matters if something starts building expressions dynamically
+CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compiled_xpath(expression):
+    return etree.XPath(expression, smart_strings=False)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compiled_css(expression):
+    return compiled_xpath(css2xpath(expression))
+
+
+def compile_selector(kind, expression):
+    return compiled_css(expression) if kind == 'css' else compiled_xpath(expression)
+
+
+def xpath(response, expression):
+    """``response.xpath(expression).getall()`` with a compiled, cached XPath."""
+    if profiling.profile is not None:
+        return profiling.timed(response, 'xpath', expression, compiled_xpath(expression))
+    return compiled_xpath(expression)(response.selector.root)
+
+
+def css(response, expression):
+    """``response.css(expression).getall()`` with a compiled, cached XPath."""
+    if profiling.profile is not None:
+        return profiling.timed(response, 'css', expression, compiled_css(expression))
+    return compiled_css(expression)(response.selector.root)
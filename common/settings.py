@@ -0,0 +1,72 @@
+# Settings shared by all spiders (merged into each spider's custom_settings)
+SPIDER_SETTINGS = {
+    'ITEM_PIPELINES': {
+        'common.pipelines.BufferedWriterPipeline': 300,
+        'common.pipelines.QueueSinkPipeline': 400,
+    },
+    'DOWNLOADER_MIDDLEWARES': {
+        'common.middlewares.ExtractionPoolMiddleware': 100,
+        'common.middlewares.HeaderProfileMiddleware': 350,
+        'common.middlewares.ArchiveMiddleware': 950,
+    },
+    'EXTENSIONS': {
+        'common.throttle.AdaptiveConcurrency': 500,
+        'common.metrics.SpiderStatsWriter': 510,
+        'common.metrics.RequestTimings': 520,
+        'common.monitor.MetricsEndpoint': 530,
+        'common.profiling.SelectorProfiler': 540,
+    },
+    'SPIDER_MIDDLEWARES': {
+        'common.middlewares.SeenUrlMiddleware': 50,
+        'common.middlewares.CallbackTimingMiddleware': 1000,
+    },
+    'WRITER_BATCH_SIZE': 100,
+    'WRITER_FLUSH_INTERVAL': 2.0,
+    'WRITER_QUEUE_SIZE': 1000,
+    # Skip articles scraped on earlier runs; set a TTL (seconds) to re-fetch them
+    'SEEN_INDEX_ENABLED': True,
+    'SEEN_INDEX_PATH': 'seen_urls.sqlite',
+    'SEEN_INDEX_TTL': 0,
+    # Bloom filter instead of a set of fingerprint strings; persisted under JOBDIR
+    'DUPEFILTER_CLASS': 'common.dupefilter.BloomDupeFilter',
+    'BLOOM_DUPEFILTER_CAPACITY': 1000000,
+    'BLOOM_DUPEFILTER_ERROR_RATE': 0.001,
+    # Listing pages are revalidated (ETag / Last-Modified), articles served from cache
+    'HTTPCACHE_ENABLED': True,
+    'HTTPCACHE_POLICY': 'common.httpcache.ListingRevalidatePolicy',
+    'HTTPCACHE_STORAGE': 'scrapy.extensions.httpcache.FilesystemCacheStorage',
+    'HTTPCACHE_DIR': 'httpcache',
+    'HTTPCACHE_GZIP': True,
+    'HTTPCACHE_ARTICLE_EXPIRATION_SECS': 0,
+    # Keep compressed raw article bodies so extraction can be replayed offline
+    'ARCHIVE_ENABLED': False,
+    'ARCHIVE_DIR': 'archive',
+    'ARCHIVE_COMPRESSLEVEL': 6,
+    # Worker processes for article extraction; 0 extracts on the reactor thread
+    'EXTRACTION_PROCESSES': 0,
+    # Per-domain concurrency / delay tuned from latency and 429/503 rates
+    'ADAPTIVE_CONCURRENCY_ENABLED': True,
+    'ADAPTIVE_TARGET_LATENCY': 2.0,
+    'ADAPTIVE_ERROR_THRESHOLD': 0.05,
+    'ADAPTIVE_WINDOW': 20,
+    'ADAPTIVE_MIN_CONCURRENCY': 1,
+    'ADAPTIVE_MAX_CONCURRENCY': 16,
+    # The delay never drops below ADAPTIVE_MIN_DELAY, or the spider's DOWNLOAD_DELAY when unset
+    'ADAPTIVE_MAX_DELAY': 30.0,
+    'ADAPTIVE_DELAY_STEP': 0.1,
+    'ADAPTIVE_STATE_FILE': 'adaptive_limits.json',
+    # Spider counters live in crawler.stats; only the latest error messages are kept
+    'SPIDER_STATS_MAX_ERRORS': 100,
+    # Latency histograms and the items/sec series, written to LATENCY_STATS_FILE at close
+    'LATENCY_STATS_ENABLED': True,
+    'LATENCY_SAMPLE_INTERVAL': 5.0,
+    'LATENCY_STATS_FILE': '{spider}_latency.json',
+    # Prometheus /metrics endpoint on localhost, shared by all crawlers of a process
+    'METRICS_ENABLED': False,
+    'METRICS_HOST': '127.0.0.1',
+    'METRICS_PORT': 9410,
+    # Opt-in per-selector / per-callback timing, ranked in PROFILING_REPORT_FILE at close
+    'PROFILING_ENABLED': False,
+    'PROFILING_REPORT_FILE': '{spider}_profile.json',
+    'PROFILING_REPORT_TOP': 10,
+}
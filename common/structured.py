@@ -0,0 +1,127 @@
+import json
+from collections import deque
+
+import lxml.html
+from lxml import etree
+
+from .selectors import compiled_xpath
+
+ARTICLE_TYPES = {'NewsArticle', 'Article', 'ReportageNewsArticle', 'AnalysisNewsArticle',
+                 'OpinionNewsArticle', 'BlogPosting', 'LiveBlogPosting'}
+BODY_KEYS = ('articleBody', 'body', 'content')
+MAX_NODES = 5000
+# Listing teasers are a sentence or two; a story body is longer than this
+MIN_BODY_CHARS = 200
+
+SOURCES = {
+    'json-ld': '//script[@type="application/ld+json"]/text()',
+    'next-data': '//script[@id="__NEXT_DATA__"]/text()',
+}
+
+
+def iter_nodes(data):
+    # Breadth-first walk over the embedded JSON, bounded so a huge
+    # __NEXT_DATA__ payload can't turn into a slow path of its own
+    queue = deque([data])
+    seen = 0
+    while queue and seen < MAX_NODES:
+        node = queue.popleft()
+        seen += 1
+        if isinstance(node, dict):
+            yield node
+            queue.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            queue.extend(v for v in node if isinstance(v, (dict, list)))
+
+
+def is_article(node):
+    types = node.get('@type')
+    types = set(types) if isinstance(types, list) else {types}
+    return bool(types & ARTICLE_TYPES)
+
+
+def looks_like_article(node):
+    # Next.js page props don't carry schema.org types: a headline plus a
+    # full-length body. Listing payloads hold many of these with short teasers.
+    return isinstance(node.get('headline'), str) and any(
+        isinstance(node.get(k), str) and len(node[k]) >= MIN_BODY_CHARS for k in BODY_KEYS)
+
+
+def text_of(value):
+    if not isinstance(value, str) or not value.strip():
+        return None
+    if '<' in value:
+        try:
+            value = lxml.html.fromstring(value).text_content()
+        except etree.ParserError:
+            # Markup without any elements or text, e.g. just a comment
+            return None
+        except ValueError:
+            pass
+    return ' '.join(value.split()) or None
+
+
+def authors_of(node):
+    author = node.get('author') or node.get('authors')
+    if not author:
+        return [], []
+    authors = author if isinstance(author, list) else [author]
+    names, urls = [], []
+    for a in authors:
+        if isinstance(a, dict):
+            if a.get('name'):
+                names.append(a['name'])
+            if a.get('url'):
+                urls.append(a['url'])
+        elif isinstance(a, str):
+            names.append(a)
+    return names, urls
+
+
+def find_article(root, sources):
+    for source in sources:
+        for payload in compiled_xpath(SOURCES[source])(root):
+            try:
+                data = json.loads(payload)
+            except ValueError:
+                continue
+            candidates = []
+            for node in iter_nodes(data):
+                if is_article(node):
+                    return node
+                if looks_like_article(node):
+                    candidates.append(node)
+            # Several untyped story-like nodes means a listing, not an article page
+            if len(candidates) == 1:
+                return candidates[0]
+    return None
+
+
+def structured_fields(root, sources):
+    """Article fields from JSON-LD / __NEXT_DATA__, only those actually present.
+
+    Author Name/URL are lists (every author listed); callers pick what the
+    site's field mode expects.
+    """
+    node = find_article(root, sources)
+    if node is None:
+        return {}
+
+    fields = {}
+    title = text_of(node.get('headline'))
+    if title:
+        fields['Title'] = title
+    names, urls = authors_of(node)
+    if names:
+        fields['Author Name'] = names
+    if urls:
+        fields['Author URL'] = urls
+    published = node.get('datePublished')
+    if isinstance(published, str) and published:
+        fields['Published Date'] = published
+    for key in BODY_KEYS:
+        body = text_of(node.get(key))
+        if body:
+            fields['Article Content'] = body
+            break
+    return fields
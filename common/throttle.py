@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_STATUSES = {429, 503}
+
+
+class SlotWindow:
+    def __init__(self):
+        self.responses = 0
+        self.errors = 0
+        self.latency = 0.0
+        self.backed_off = False
+
+
+class AdaptiveConcurrency:
+    """Per-domain AIMD controller for downloader concurrency and delay.
+
+    Every ADAPTIVE_WINDOW responses of a download slot, the average latency
+    and the share of 429/503 answers are compared with
+    ADAPTIVE_TARGET_LATENCY and ADAPTIVE_ERROR_THRESHOLD: if either is
+    exceeded, concurrency is halved and the delay doubled, otherwise
+    concurrency grows by one and the delay shrinks by ADAPTIVE_DELAY_STEP,
+    down to ADAPTIVE_MIN_DELAY. Like AutoThrottle, that floor defaults to the
+    spider's own DOWNLOAD_DELAY, so a politeness delay is never tuned away.
+    A 429/503 also backs off immediately (once per window). The current
+    limits are kept in the crawl stats (``adaptive/<domain>/...``) and saved
+    to ADAPTIVE_STATE_FILE so the next run starts from them.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        if not settings.getbool('ADAPTIVE_CONCURRENCY_ENABLED'):
+            raise NotConfigured
+        self.crawler = crawler
+        self.target_latency = settings.getfloat('ADAPTIVE_TARGET_LATENCY', 2.0)
+        self.error_threshold = settings.getfloat('ADAPTIVE_ERROR_THRESHOLD', 0.05)
+        self.window = settings.getint('ADAPTIVE_WINDOW', 20)
+        self.min_concurrency = settings.getint('ADAPTIVE_MIN_CONCURRENCY', 1)
+        self.max_concurrency = settings.getint('ADAPTIVE_MAX_CONCURRENCY', 16)
+        self.explicit_min_delay = settings.get('ADAPTIVE_MIN_DELAY') is not None
+        self.min_delay = settings.getfloat('ADAPTIVE_MIN_DELAY', settings.getfloat('DOWNLOAD_DELAY'))
+        self.max_delay = settings.getfloat('ADAPTIVE_MAX_DELAY', 30.0)
+        self.delay_step = settings.getfloat('ADAPTIVE_DELAY_STEP', 0.1)
+        self.state_file = settings.get('ADAPTIVE_STATE_FILE', 'adaptive_limits.json')
+        self.learned = {}
+        self.windows = {}
+        self.seeded = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(ext.response_downloaded, signal=signals.response_downloaded)
+        return ext
+
+    def spider_opened(self, spider):
+        if not self.explicit_min_delay:
+            self.min_delay = getattr(spider, 'download_delay', self.min_delay)
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                try:
+                    self.learned = json.load(f)
+                except json.JSONDecodeError:
+                    self.learned = {}
+
+    def get_slot(self, request):
+        key = request.meta.get('download_slot')
+        return key, self.crawler.engine.downloader.slots.get(key)
+
+    def request_reached_downloader(self, request, spider):
+        key, slot = self.get_slot(request)
+        if slot is None or key in self.seeded:
+            return
+        # First request to this domain: start from what the last run learned
+        self.seeded.add(key)
+        if key in self.learned:
+            slot.concurrency = self.learned[key]['concurrency']
+            # Limits saved before the floor applied may be below it
+            slot.delay = max(self.min_delay, self.learned[key]['delay'])
+        self.record(key, slot)
+
+    def response_downloaded(self, response, request, spider):
+        key, slot = self.get_slot(request)
+        if slot is None:
+            return
+        window = self.windows.setdefault(key, SlotWindow())
+        window.responses += 1
+        window.latency += request.meta.get('download_latency', 0.0)
+
+        if response.status in BACKOFF_STATUSES:
+            window.errors += 1
+            self.crawler.stats.inc_value(f'adaptive/{key}/backoff_responses')
+            if not window.backed_off:
+                window.backed_off = True
+                self.decrease(key, slot)
+
+        if window.responses >= self.window:
+            error_rate = window.errors / window.responses
+            latency = window.latency / window.responses
+            if not window.backed_off:
+                if error_rate > self.error_threshold or latency > self.target_latency:
+                    self.decrease(key, slot)
+                else:
+                    self.increase(key, slot)
+            self.windows[key] = SlotWindow()
+
+    def decrease(self, key, slot):
+        slot.concurrency = max(self.min_concurrency, slot.concurrency // 2)
+        slot.delay = min(self.max_delay, max(slot.delay * 2, self.delay_step))
+        logger.info(f"Backing off {key}: concurrency {slot.concurrency}, delay {slot.delay:.2f}s")
+        self.record(key, slot)
+
+    def increase(self, key, slot):
+        slot.concurrency = min(self.max_concurrency, slot.concurrency + 1)
+        slot.delay = max(self.min_delay, slot.delay - self.delay_step)
+        self.record(key, slot)
+
+    def record(self, key, slot):
+        self.crawler.stats.set_value(f'adaptive/{key}/concurrency', slot.concurrency)
+        self.crawler.stats.set_value(f'adaptive/{key}/delay', round(slot.delay, 3))
+        self.learned[key] = {'concurrency': slot.concurrency, 'delay': round(slot.delay, 3)}
+
+    def spider_closed(self, spider):
+        # Merge with the file as it is now: other spiders may have saved their domains
+        state = {}
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                try:
+                    state = json.load(f)
+                except json.JSONDecodeError:
+                    state = {}
+        state.update({key: self.learned[key] for key in self.seeded if key in self.learned})
+        with open(self.state_file, 'w') as f:
+            json.dump(state, f, indent=4)
@@ -0,0 +1,19 @@
+import hashlib
+
+from w3lib.url import canonicalize_url
+
+
+def callback_name(request):
+    # Requests without an explicit callback go to the spider's parse method
+    callback = getattr(request, 'callback', None)
+    return getattr(callback, '__name__', 'parse')
+
+
+def is_article_request(request):
+    # Article pages are the ones handled by a spider's parse_article callback;
+    # everything else (listings, collection API pages, feeds) is discovery
+    return callback_name(request) == 'parse_article'
+
+
+def url_fingerprint(url):
+    return hashlib.sha1(canonicalize_url(url).encode('utf-8')).hexdigest()
@@ -5,26 +5,24 @@ import os
 from scrapy.crawler import CrawlerProcess
 
 
-def get_urls(foldername,max_pages=5):
-    urls_to_scrape=[]
+def get_urls(foldername):
+    # Yield only the first page of each section; the spider requests further
+    # pages itself while they keep producing new article links
     current_dir = os.path.dirname(os.path.abspath(__file__))
     file_path = os.path.join(current_dir, foldername, 'urls.txt')
     with open(file_path, 'r') as file:
-        urls = file.readlines()
-    
-    for url in urls:
-        url = url.strip()  # Remove extra spaces or newlines
-        if url:
-            for page_num in range(1, max_pages + 1):
-                urls_to_scrape.append(f"{url}?page={page_num}")    
-    return urls_to_scrape    
+        for url in file:
+            url = url.strip()  # Remove extra spaces or newlines
+            if url:
+                yield f"{url}?page=1"
 
 
-# Check the modified URLs (optional, for debugging purposes)
-print("Modified URLs to scrape:")
-# print(get_urls('economist'))
+if __name__ == '__main__':
+    # Check the modified URLs (optional, for debugging purposes)
+    print("Modified URLs to scrape:")
+    # print(get_urls('economist'))
 
 
-process = CrawlerProcess()
-process.crawl(economistspider, urls=get_urls('economist'))
-process.start()
\ No newline at end of file
+    process = CrawlerProcess()
+    process.crawl(economistspider, urls=get_urls('economist'), max_pages=5)
+    process.start()
@@ -0,0 +1 @@
+from .inc42 import inc42spider
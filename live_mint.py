@@ -5,7 +5,11 @@ from scrapy.crawler import CrawlerProcess
 
 class livemintspider(scrapy.Spider):
     name = 'livemint_spider'
-    
+    # Request headers come from the shared browser profile in common/headers.py
+    custom_settings = {
+        'DOWNLOADER_MIDDLEWARES': {'common.middlewares.HeaderProfileMiddleware': 350},
+    }
+
     def __init__(self, urls=None, *args, **kwargs):
         super(livemintspider, self).__init__(*args, **kwargs)
         self.start_urls = urls if urls else []
@@ -18,15 +22,7 @@ class livemintspider(scrapy.Spider):
         
     def start_requests(self):
         for url in self.start_urls:
-            yield scrapy.Request(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            })
+            yield scrapy.Request(url)
 
     def parse(self, response):
         relative_urls = response.css('div.listingNew a.imgSec::attr(href)').getall()
@@ -34,13 +30,7 @@ class livemintspider(scrapy.Spider):
 
         for url in full_urls:            
             if url:
-                yield scrapy.Request(
-                    url, 
-                    callback=self.parse_article,
-                    headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                    }
-                )
+                yield scrapy.Request(url, callback=self.parse_article)
 
     def parse_article(self, response):    
         if response.status == 200:
@@ -0,0 +1 @@
+from .livemint import livemintSpider
@@ -1,55 +1,66 @@
 import scrapy
-import json
 import os
 from scrapy.crawler import CrawlerProcess
 from scrapy.exceptions import IgnoreRequest
-from collections import Counter
 import logging
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.settings import SPIDER_SETTINGS
+from common.metrics import SpiderMetrics
+from common.pagination import Paginator
+from common.extraction import get_extractor
+from common.feeds import FEED_ERRORS, FEEDS, feed_requests, follow_feed
+from common.selectors import css
 
 class livemintSpider(scrapy.Spider):
     name = 'livemint_spider'   
-    def __init__(self, urls=None, *args, **kwargs):
+    # Concurrency and delay are tuned per domain by AdaptiveConcurrency; the
+    # delay here is only the starting point before anything has been learned
+    custom_settings = {
+        **SPIDER_SETTINGS,
+        'DOWNLOAD_DELAY': 1,
+        'RANDOMIZE_DOWNLOAD_DELAY': True,
+    }
+    def __init__(self, urls=None, max_pages=1, discovery='listing', feed_urls=None, *args, **kwargs):
         super(livemintSpider, self).__init__(*args, **kwargs)
         self.start_urls = urls if urls else []
+        # Listing pages are followed one by one while they keep yielding new links
+        self.paginator = Paginator(int(max_pages))
+        # 'listing' scrapes the section pages, 'feeds' reads the news sitemap / RSS feed
+        self.discovery = discovery
+        self.feed_urls = feed_urls or FEEDS['www.livemint.com']
+        # Selectors come from the per-site registry in common/extraction.py
+        self.extractor = get_extractor('www.livemint.com')
         self.output_file = 'livemint.json'
         self.stats_file = 'livemint_spider_stats.json'
-        self.stats = {
-            'total_baseURL': 0,
-            'total_requests': 0,
-            'successful_baseURL': 0,
-            'failed_baseURL': 0,
-            'successful_requests': 0,
-            'failed_requests': 0,
-            'articles_scraped': 0,
-            'response_codes': Counter(),
-            'errors': []
-        }
-
-        # Create an empty list in the file if it doesn't exist
-        if not os.path.exists(self.output_file):
-            with open(self.output_file, 'w') as f:
-                json.dump([], f)
+        self.metrics = SpiderMetrics()
         
     def start_requests(self):
+        if self.discovery == 'feeds':
+            yield from feed_requests(self.feed_urls, self.parse_feed, self.errback_httpbin)
+            return
+        yield from self.listing_requests()
+
+    def listing_requests(self):
+        # Section listing pages; also the fallback when a feed is unusable
+        # (repeats from several bad feeds are dropped by the dupefilter)
         for url in self.start_urls:
-            yield scrapy.Request(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }, callback=self.parse, errback=self.errback_httpbin)
+            # Browser headers come from HeaderProfileMiddleware
+            yield scrapy.Request(url, callback=self.parse, errback=self.errback_httpbin)
 
     def parse(self, response):
-        self.stats['total_baseURL'] += 1
-        self.stats['response_codes'][str(response.status)] += 1
+        if response.meta.get('not_modified'):
+            # Listing unchanged since it was cached (HTTP 304); nothing new to follow
+            self.logger.info(f"Listing not modified, skipping: {response.url}")
+            return
+        self.metrics.inc('total_baseURL')
+        self.metrics.status(response.status)
         
         if response.status == 200:
-            # self.stats['successful_requests'] += 1
-            self.stats['successful_baseURL'] += 1
-            relative_urls = response.css('div.listingNew a.imgSec::attr(href)').getall()
+            # self.metrics.inc('successful_requests')
+            self.metrics.inc('successful_baseURL')
+            relative_urls = css(response, 'div.listingNew a.imgSec::attr(href)')
             full_urls = [response.urljoin(url) for url in relative_urls]
 
             for url in full_urls:            
@@ -57,86 +68,79 @@ class livemintSpider(scrapy.Spider):
                     yield scrapy.Request(
                         url, 
                         callback=self.parse_article,
-                        errback=self.errback_httpbin,
-                        headers={
-                            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                        }
+                        errback=self.errback_httpbin
                     )
+
+            next_page = self.paginator.next_page(response.url, full_urls)
+            if next_page:
+                yield scrapy.Request(next_page, callback=self.parse, errback=self.errback_httpbin)
         else:
-            self.stats['failed_baseURL'] += 1
+            self.metrics.inc('failed_baseURL')
             self.logger.error(f"Failed to parse page: {response.url} with status code: {response.status}")
 
+    def parse_feed(self, response):
+        self.metrics.inc('total_baseURL')
+        self.metrics.status(response.status)
+
+        if response.status != 200:
+            self.metrics.inc('failed_baseURL')
+            self.logger.error(f"Failed to parse feed: {response.url} with status code: {response.status}")
+            yield from self.listing_requests()
+            return
+
+        try:
+            yield from follow_feed(response, self.parse_article, self.parse_feed, self.errback_httpbin)
+        except FEED_ERRORS as e:
+            self.metrics.inc('failed_baseURL')
+            self.logger.error(f"Invalid feed: {response.url}. Error: {str(e)}")
+            self.metrics.error(f"Invalid feed: {response.url}. Error: {str(e)}", type(e).__name__)
+            yield from self.listing_requests()
+            return
+        self.metrics.inc('successful_baseURL')
+
     def parse_article(self, response):
-        self.stats['total_requests'] += 1
-        self.stats['response_codes'][str(response.status)] += 1
-        
+        self.metrics.inc('total_requests')
+        self.metrics.status(response.status)
+
         if response.status == 200:
-            self.stats['successful_requests'] += 1
-            self.stats['articles_scraped'] += 1
-            
-            title = response.xpath('//h1/text()').get()
-            author_name = response.xpath('//div[contains(@class, "storyPage_authorDesc__zPjwo")]/a/strong/text()').get()
-            author_url = response.xpath('//div[contains(@class, "storyPage_authorDesc__zPjwo")]/a/@href').get()
-            published_date = response.xpath('//div[contains(@class, "storyPage_date__JS9qJ")]//span/text()').get()
-            article_content = response.xpath('//div[@class="storyPage_storyContent__m_MYl"]//p/text()').getall()
-            article_content = ' '.join([p.strip() for p in article_content if p.strip()])
+            self.metrics.inc('successful_requests')
+            self.metrics.inc('articles_scraped')
+            article = self.extractor.extract(response)
         else:
-            self.stats['failed_requests'] += 1
+            self.metrics.inc('failed_requests')
             self.logger.error(f"Failed to parse article: {response.url} with status code: {response.status}")
-            title = None
-            author_name = None
-            author_url = None
-            published_date = None
-            article_content = None
+            article = self.extractor.empty()
 
         article_data = {
             "Response Code": response.status,
             "Article URL": response.url,
-            "Title": title,
-            "Author Name": author_name,
-            "Author URL": author_url,
-            "Article Content": article_content,
-            "Published Date": published_date
+            **article
         }
-
-        # Append article data to the JSON file
-        self.append_to_json_file(article_data)
+        yield article_data
 
     def errback_httpbin(self, failure):
-        self.stats['failed_requests'] += 1
+        self.metrics.inc('failed_requests')
         if failure.check(IgnoreRequest):
             self.logger.error(f"IgnoreRequest error on {failure.request.url}")
-            self.stats['errors'].append(f"IgnoreRequest error on {failure.request.url}")
+            self.metrics.error(f"IgnoreRequest error on {failure.request.url}", 'IgnoreRequest')
         else:
             self.logger.error(f"Error on {failure.request.url}: {str(failure.value)}")
-            self.stats['errors'].append(f"Error on {failure.request.url}: {str(failure.value)}")
-
-    def append_to_json_file(self, data):
-        # Load existing data from the JSON file
-        with open(self.output_file, 'r+') as file:
-            articles = json.load(file)
-            # Append new article data
-            articles.append(data)
-            # Move cursor to the beginning of the file
-            file.seek(0)
-            # Write updated data
-            json.dump(articles, file, indent=4)
+            self.metrics.error(f"Error on {failure.request.url}: {str(failure.value)}", failure.type.__name__)
 
     def closed(self, reason):
-        # Save statistics to a JSON file
-        with open(self.stats_file, 'w') as f:
-            json.dump(self.stats, f, indent=4)
+        # The stats file itself is written by common.metrics.SpiderStatsWriter
+        stats = self.metrics.snapshot()
         
         
-        self.logger.info(f"Total BaseURLs: {self.stats['total_baseURL']}")
-        self.logger.info(f"Successful BaseURL requests: {self.stats['successful_baseURL']}")
-        self.logger.info(f"Failed BaseURL requests: {self.stats['failed_baseURL']}")
+        self.logger.info(f"Total BaseURLs: {stats['total_baseURL']}")
+        self.logger.info(f"Successful BaseURL requests: {stats['successful_baseURL']}")
+        self.logger.info(f"Failed BaseURL requests: {stats['failed_baseURL']}")
         self.logger.info(f"Spider closed: {reason}")
-        self.logger.info(f"Total requests: {self.stats['total_requests']}")
-        self.logger.info(f"Successful requests: {self.stats['successful_requests']}")
-        self.logger.info(f"Failed requests: {self.stats['failed_requests']}")
-        self.logger.info(f"Articles scraped: {self.stats['articles_scraped']}")
-        self.logger.info(f"Response codes: {dict(self.stats['response_codes'])}")
+        self.logger.info(f"Total requests: {stats['total_requests']}")
+        self.logger.info(f"Successful requests: {stats['successful_requests']}")
+        self.logger.info(f"Failed requests: {stats['failed_requests']}")
+        self.logger.info(f"Articles scraped: {stats['articles_scraped']}")
+        self.logger.info(f"Response codes: {stats['response_codes']}")
 
 # List of URLs to scrape
 urls_to_scrape = [
@@ -167,13 +171,11 @@ urls_to_scrape = [
     "https://www.livemint.com/opinion"
 ]
 
-process = CrawlerProcess({
-    'LOG_LEVEL': 'INFO',
-    'CONCURRENT_REQUESTS': 16,
-    'DOWNLOAD_DELAY': 1,
-    'RANDOMIZE_DOWNLOAD_DELAY': True,
-})
+if __name__ == '__main__':
+    process = CrawlerProcess({
+        'LOG_LEVEL': 'INFO',
+    })
 
-# Pass the list of URLs
-process.crawl(livemintSpider, urls=urls_to_scrape)
-process.start()
\ No newline at end of file
+    # Pass the list of URLs
+    process.crawl(livemintSpider, urls=urls_to_scrape)
+    process.start()
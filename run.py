@@ -0,0 +1,218 @@
+import argparse
+import json
+import multiprocessing
+import queue
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from scrapy.crawler import Crawler, CrawlerProcess
+
+from common.archive import HtmlArchive
+from common.jsonl_writer import JsonLinesWriter
+from common.replay import replay_chunk
+
+from economist import economistspider
+from economist.economist import urls_to_scrape as economist_urls
+from inc42 import inc42spider
+from inc42.inc42 import urls_to_scrape as inc42_urls
+from livemint import livemintSpider
+from livemint.livemint import urls_to_scrape as livemint_urls
+from telegraph import telegraphspider
+from telegraph.telegraph import urls_to_scrape as telegraph_urls
+from DT import DTspider
+from DT.digitalterminal import urls_to_scrape as dt_urls
+
+# name -> (spider class, start URLs)
+SPIDERS = {
+    'economist': (economistspider, economist_urls),
+    'inc42': (inc42spider, inc42_urls),
+    'livemint': (livemintSpider, livemint_urls),
+    'telegraph': (telegraphspider, telegraph_urls),
+    'dt': (DTspider, dt_urls),
+}
+
+
+def crawl_all(names, concurrency=32, spider_kwargs=None, overrides=None):
+    # All spiders share one reactor; the global request budget is split
+    # evenly between them so adding publishers doesn't multiply the load
+    process = CrawlerProcess({'LOG_LEVEL': 'INFO'})
+    per_spider = max(1, concurrency // len(names))
+
+    for name in names:
+        spidercls, urls = SPIDERS[name]
+        settings = process.settings.copy()
+        settings.set('CONCURRENT_REQUESTS', per_spider, priority='cmdline')
+        settings.set('CONCURRENT_REQUESTS_PER_DOMAIN', min(8, per_spider), priority='cmdline')
+        settings.setdict(overrides or {}, priority='cmdline')
+        crawler = Crawler(spidercls, settings, init_reactor=True)
+        process.crawl(crawler, urls=urls, **(spider_kwargs or {}).get(name, {}))
+
+    process.start()
+
+
+def run_worker(name, item_sink, results, concurrency, spider_kwargs, overrides):
+    # Runs in a child process: one publisher, one reactor, one core
+    spidercls, urls = SPIDERS[name]
+    process = CrawlerProcess({'LOG_LEVEL': 'INFO'})
+    settings = process.settings.copy()
+    settings.set('CONCURRENT_REQUESTS', concurrency, priority='cmdline')
+    settings.setdict(overrides or {}, priority='cmdline')
+    crawler = Crawler(spidercls, settings, init_reactor=True)
+    process.crawl(crawler, urls=urls, item_sink=item_sink, **spider_kwargs)
+    process.start()
+
+    stats = crawler.spider.metrics.snapshot() if crawler.spider else {}
+    results.put((name, stats))
+    item_sink.put((name, None))
+
+
+def merge_stats(per_spider):
+    # Numbers are summed, counters merged and error lists concatenated
+    combined = {}
+    for stats in per_spider.values():
+        for key, value in stats.items():
+            if isinstance(value, dict):
+                combined.setdefault(key, Counter()).update(value)
+            elif isinstance(value, list):
+                combined.setdefault(key, []).extend(value)
+            elif isinstance(value, (int, float)):
+                combined[key] = combined.get(key, 0) + value
+    combined = {key: dict(value) if isinstance(value, Counter) else value for key, value in combined.items()}
+    combined['per_spider'] = per_spider
+    return combined
+
+
+def crawl_parallel(names, concurrency=32, spider_kwargs=None, overrides=None,
+                   output_file='all_articles.jsonl', stats_file='combined_spider_stats.json'):
+    # One worker process per publisher; items stream back over a queue into a
+    # single JSON Lines file and the spiders' stats are merged at the end
+    ctx = multiprocessing.get_context('spawn')
+    item_sink = ctx.Queue()
+    results = ctx.Queue()
+    per_spider = max(1, concurrency // len(names))
+
+    workers = []
+    for i, name in enumerate(names):
+        worker_overrides = dict(overrides or {})
+        if 'METRICS_PORT' in worker_overrides:
+            # Each worker process serves its own endpoint on the next port up
+            worker_overrides['METRICS_PORT'] += i
+        worker = ctx.Process(
+            target=run_worker,
+            args=(name, item_sink, results, per_spider, (spider_kwargs or {}).get(name, {}), worker_overrides),
+            name=f'crawl-{name}',
+        )
+        worker.start()
+        workers.append(worker)
+
+    running = set(names)
+    with JsonLinesWriter(output_file) as writer:
+        while running:
+            try:
+                name, item = item_sink.get(timeout=1)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    break
+                continue
+            if item is None:
+                running.discard(name)
+            else:
+                writer.write(item)
+
+    # Drain the results before joining so no worker blocks on a full pipe
+    per_spider_stats = {}
+    while len(per_spider_stats) < len(names):
+        try:
+            name, stats = results.get(timeout=5)
+        except queue.Empty:
+            break
+        per_spider_stats[name] = stats
+
+    for worker in workers:
+        worker.join()
+
+    combined = merge_stats(per_spider_stats)
+    with open(stats_file, 'w') as f:
+        json.dump(combined, f, indent=4)
+    return combined
+
+
+def replay_archive(names, processes=None, archive_dir='archive', chunk_size=200):
+    # Re-run each spider's parse_article over the archived article bodies in a
+    # process pool; results go to <name>_replay.jsonl, nothing is downloaded
+    archive = HtmlArchive(archive_dir)
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as executor:
+        for name in names:
+            spidercls, _ = SPIDERS[name]
+            rows = archive.pages(spidercls.name)
+            chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+            futures = [executor.submit(replay_chunk, spidercls, archive_dir, chunk) for chunk in chunks]
+
+            chunk_stats = {}
+            with JsonLinesWriter(f'{name}_replay.jsonl') as writer:
+                for i, future in enumerate(as_completed(futures)):
+                    items, stats = future.result()
+                    writer.write_many(items)
+                    chunk_stats[str(i)] = stats
+
+            combined = merge_stats(chunk_stats)
+            combined.pop('per_spider', None)
+            with open(f'{name}_replay_stats.json', 'w') as f:
+                json.dump(combined, f, indent=4)
+            print(f"{name}: replayed {len(rows)} archived pages, "
+                  f"{combined.get('articles_scraped', 0)} articles extracted")
+    archive.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Crawl all news sites in a single process")
+    parser.add_argument('spiders', nargs='*', metavar='spider',
+                        help=f"spiders to run: {', '.join(SPIDERS)} (default: all)")
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help="total concurrent requests shared by all spiders")
+    parser.add_argument('--max-pages', type=int, default=1,
+                        help="follow each section's listing pages up to this page number")
+    parser.add_argument('--processes', action='store_true',
+                        help="run each spider in its own process and merge items and stats")
+    parser.add_argument('--archive', action='store_true',
+                        help="store raw article bodies in the archive (ARCHIVE_DIR) for offline replay")
+    parser.add_argument('--extract-processes', type=int, default=0,
+                        help="extract article fields in this many worker processes per crawler")
+    parser.add_argument('--replay', action='store_true',
+                        help="re-extract articles from the archive instead of crawling")
+    parser.add_argument('--feeds', action='store_true',
+                        help="discover articles from news sitemaps / RSS feeds instead of listing pages")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics "
+                             "(with --processes, one port per spider counting up from PORT)")
+    parser.add_argument('--profile', action='store_true',
+                        help="time every selector and callback and write <spider>_profile.json rankings")
+    parser.add_argument('--dt-discovery', choices=['browser', 'api'], default='browser',
+                        help="how DTspider discovers articles from listing pages")
+    args = parser.parse_args()
+    unknown = set(args.spiders) - set(SPIDERS)
+    if unknown:
+        parser.error(f"unknown spiders: {', '.join(sorted(unknown))}")
+
+    names = args.spiders or list(SPIDERS)
+    spider_kwargs = {name: {'max_pages': args.max_pages} for name in SPIDERS if name != 'dt'}
+    spider_kwargs['dt'] = {'discovery': args.dt_discovery}
+    if args.feeds:
+        for kwargs in spider_kwargs.values():
+            kwargs['discovery'] = 'feeds'
+    overrides = {'ARCHIVE_ENABLED': True} if args.archive else {}
+    if args.extract_processes:
+        overrides['EXTRACTION_PROCESSES'] = args.extract_processes
+    if args.profile:
+        overrides['PROFILING_ENABLED'] = True
+    if args.metrics_port is not None:
+        overrides.update({'METRICS_ENABLED': True, 'METRICS_PORT': args.metrics_port})
+    if args.replay:
+        replay_archive(names)
+    elif args.processes:
+        combined = crawl_parallel(names, concurrency=args.concurrency, spider_kwargs=spider_kwargs,
+                                  overrides=overrides)
+        print(f"Articles scraped: {combined.get('articles_scraped', 0)}")
+    else:
+        crawl_all(names, concurrency=args.concurrency, spider_kwargs=spider_kwargs, overrides=overrides)
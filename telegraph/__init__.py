@@ -0,0 +1 @@
+from .telegraph import telegraphspider
@@ -13,16 +13,11 @@ class LivemintSpider(scrapy.Spider):
             'https://www.livemint.com/market/'
         ]
 
-    # Define headers to simulate a browser
-    custom_headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Connection': 'keep-alive',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                    'Referer': 'https://www.livemint.com/',
-                    'Upgrade-Insecure-Requests': '1'
-                    }
-
+    # Request headers come from the livemint profile in common/headers.py
+    custom_settings = {
+        'DOWNLOADER_MIDDLEWARES': {'common.middlewares.HeaderProfileMiddleware': 350},
+        'HEADER_PROFILE_DOMAINS': {'www.livemint.com': 'livemint'},
+    }
 
     def parse(self, response):
         # Extract all div blocks that have article links
@@ -36,11 +31,7 @@ class LivemintSpider(scrapy.Spider):
             full_url = response.urljoin(relative_url)
 
             # Make a request to each article URL and call the parse_article method
-            yield scrapy.Request(
-                full_url, 
-                callback=self.parse_article, 
-                headers=self.custom_headers  # Include headers in each request
-            )
+            yield scrapy.Request(full_url, callback=self.parse_article)
 
     def parse_article(self, response):
         if response.status == 200:
@@ -0,0 +1,114 @@
+import gzip
+import os
+
+import pytest
+from scrapy import Request, Spider
+from scrapy.exceptions import NotConfigured
+from scrapy.http import HtmlResponse, Response
+from scrapy.utils.test import get_crawler
+
+from common.archive import HtmlArchive
+from common.middlewares import ArchiveMiddleware
+
+URL = 'https://inc42.com/buzz/story/'
+BODY = b'<html><body><h1>Story</h1></body></html>'
+
+
+def parse_article(response):
+    pass
+
+
+def parse(response):
+    pass
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = HtmlArchive(str(tmp_path / 'archive'))
+    yield archive
+    archive.close()
+
+
+def test_put_and_get(archive):
+    digest, stored = archive.put(URL, BODY, spider='inc42', encoding='utf-8')
+    assert stored
+    assert archive.get(digest) == BODY
+    path = archive.object_path(digest)
+    assert path.endswith(os.path.join(digest[:2], digest + '.gz'))
+    with open(path, 'rb') as f:
+        assert gzip.decompress(f.read()) == BODY
+
+
+def test_identical_bodies_are_stored_once(archive):
+    digest, stored = archive.put(URL + '1', BODY, spider='inc42')
+    assert stored
+    assert archive.put(URL + '2', BODY, spider='inc42') == (digest, False)
+    assert [row[0] for row in archive.pages('inc42')] == [URL + '1', URL + '2']
+    assert len(os.listdir(os.path.dirname(archive.object_path(digest)))) == 1
+
+
+def test_pages_index(archive):
+    archive.put(URL, BODY, spider='inc42', status=200, encoding='cp1252')
+    archive.put('https://www.economist.com/a', b'<html/>', spider='economist')
+    digest, _ = archive.put(URL, BODY + b'<!-- v2 -->', spider='inc42')
+    # Re-archiving a URL replaces its row
+    assert archive.pages('inc42') == [(URL, 'inc42', digest, 200, 'utf-8')]
+    assert [row[0] for row in archive.pages()] == ['https://inc42.com/buzz/story/', 'https://www.economist.com/a']
+
+
+def test_index_persists(tmp_path):
+    archive = HtmlArchive(str(tmp_path / 'archive'), batch_size=10)
+    digest, _ = archive.put(URL, BODY, spider='inc42')
+    archive.close()
+    archive = HtmlArchive(str(tmp_path / 'archive'))
+    assert archive.pages('inc42') == [(URL, 'inc42', digest, 200, 'utf-8')]
+    archive.close()
+
+
+@pytest.fixture
+def middleware(tmp_path):
+    crawler = get_crawler(Spider, {'ARCHIVE_ENABLED': True, 'ARCHIVE_DIR': str(tmp_path / 'archive')})
+    mw = ArchiveMiddleware.from_crawler(crawler)
+    yield mw, crawler, Spider('inc42')
+    mw.archive.close()
+
+
+def response(url=URL, status=200, callback=parse_article, cls=HtmlResponse, flags=None):
+    return cls(url, status=status, body=BODY, request=Request(url, callback=callback), flags=flags)
+
+
+def test_middleware_not_configured():
+    with pytest.raises(NotConfigured):
+        ArchiveMiddleware(get_crawler(Spider, {'ARCHIVE_ENABLED': False}))
+
+
+def test_middleware_archives_article_responses(middleware):
+    mw, crawler, spider = middleware
+    for r in (response(), response(URL + 'copy')):
+        assert mw.process_response(r.request, r, spider) is r
+    assert [row[:2] for row in mw.archive.pages()] == [(URL, 'inc42'), (URL + 'copy', 'inc42')]
+    assert crawler.stats.get_value('archive/stored') == 1
+    assert crawler.stats.get_value('archive/deduplicated') == 1
+
+
+@pytest.mark.parametrize('r', [
+    response(status=404),
+    response(callback=parse),
+    response(cls=Response),
+], ids=['error', 'listing', 'not-text'])
+def test_middleware_skips_other_responses(middleware, r):
+    mw, _, spider = middleware
+    assert mw.process_response(r.request, r, spider) is r
+    assert mw.archive.pages() == []
+
+
+def test_middleware_archives_cache_hits_once(middleware):
+    mw, crawler, spider = middleware
+    # A page cached before archiving was turned on is archived when served...
+    r = response(flags=['cached'])
+    mw.process_response(r.request, r, spider)
+    assert [row[0] for row in mw.archive.pages()] == [URL]
+    # ...and later cache hits for it are skipped
+    mw.process_response(r.request, r, spider)
+    assert crawler.stats.get_value('archive/stored') == 1
+    assert crawler.stats.get_value('archive/deduplicated') is None
@@ -0,0 +1,85 @@
+import hashlib
+
+import pytest
+
+from common.bloom import ScalableBloomFilter
+
+
+def fingerprint(n):
+    return hashlib.sha1(str(n).encode()).digest()
+
+
+def test_added_fingerprints_are_members():
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01)
+    for n in range(500):
+        assert bloom.add(fingerprint(n)) is False
+    assert all(fingerprint(n) in bloom for n in range(500))
+    assert len(bloom) == 500
+
+
+def test_add_reports_duplicates():
+    bloom = ScalableBloomFilter(initial_capacity=100)
+    bloom.add(fingerprint(1))
+    assert bloom.add(fingerprint(1)) is True
+    assert len(bloom) == 1
+
+
+def test_grows_a_layer_when_full():
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    for n in range(250):
+        bloom.add(fingerprint(n))
+    assert len(bloom.layers) == 2
+    assert bloom.layers[1].capacity == 200
+    assert bloom.layers[1].error_rate < bloom.layers[0].error_rate
+    assert all(fingerprint(n) in bloom for n in range(250))
+
+
+def test_false_positive_rate_stays_bounded():
+    error_rate = 0.01
+    bloom = ScalableBloomFilter(initial_capacity=2000, error_rate=error_rate)
+    # Past the first layer's capacity, so the bound covers every layer
+    for n in range(5000):
+        bloom.add(fingerprint(n))
+    trials = 20000
+    false_positives = sum(fingerprint(n) in bloom for n in range(5000, 5000 + trials))
+    # The layers' rates sum to at most error_rate; allow for sampling noise
+    assert false_positives / trials <= error_rate * 1.5
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / 'seen.bloom')
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    for n in range(300):
+        bloom.add(fingerprint(n))
+    bloom.save(path)
+
+    loaded = ScalableBloomFilter.load(path)
+    try:
+        assert len(loaded) == len(bloom)
+        assert (loaded.initial_capacity, loaded.error_rate, loaded.tightening) == \
+            (bloom.initial_capacity, bloom.error_rate, bloom.tightening)
+        assert [(l.capacity, l.bits, l.hashes) for l in loaded.layers] == \
+            [(l.capacity, l.bits, l.hashes) for l in bloom.layers]
+        assert all(fingerprint(n) in loaded for n in range(300))
+        assert sum(fingerprint(n) in loaded for n in range(300, 1300)) == \
+            sum(fingerprint(n) in bloom for n in range(300, 1300))
+
+        # The snapshot is mapped copy-on-write: the loaded filter stays
+        # writable and the file is only changed by an explicit save
+        assert loaded.add(fingerprint('new')) is False
+        assert fingerprint('new') in loaded
+    finally:
+        loaded.close()
+
+    reloaded = ScalableBloomFilter.load(path)
+    try:
+        assert len(reloaded) == len(bloom)
+    finally:
+        reloaded.close()
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-a-bloom'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        ScalableBloomFilter.load(str(path))
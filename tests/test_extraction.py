@@ -0,0 +1,153 @@
+import json
+
+import pytest
+from scrapy.http import HtmlResponse
+
+from common.extraction import FIELDS, SITES, ArticleExtractor, get_extractor, select
+
+
+def page(url, body):
+    return HtmlResponse(url, body=f'<html><body>{body}</body></html>'.encode(), encoding='utf-8')
+
+
+def test_every_site_has_every_field():
+    for domain, config in SITES.items():
+        assert set(FIELDS) <= set(config), domain
+        assert list(get_extractor(domain).extract(page(f'https://{domain}/', '')).keys()) == FIELDS
+
+
+def test_extractors_are_built_once():
+    assert get_extractor('inc42.com') is get_extractor('inc42.com')
+
+
+@pytest.mark.parametrize('mode, expected', [
+    ('first', ' a '),
+    ('all', [' a ', ' ', 'b']),
+    ('join', ' a    b'),
+    ('join_strip', 'a b'),
+    (1, ' '),
+    (5, None),
+])
+def test_select(mode, expected):
+    assert select([' a ', ' ', 'b'], mode) == expected
+
+
+def test_select_nothing():
+    assert select([], 'first') is None
+    assert select([], 'join') == ''
+
+
+def test_inc42():
+    response = page('https://inc42.com/buzz/story/', '''
+        <h1 class="entry-title">Startup raises funding</h1>
+        <a rel="author" href="https://inc42.com/author/a-writer/">A. Writer</a>
+        <div class="date"><span>02 Sep 2024</span><span>5 min read</span></div>
+        <div class="single-post-content"><p>First <b>part</b>.</p><p>Second.</p></div>
+    ''')
+    assert get_extractor('inc42.com').extract(response) == {
+        'Title': 'Startup raises funding',
+        'Author Name': 'A. Writer',
+        'Author URL': 'https://inc42.com/author/a-writer/',
+        'Article Content': 'First  part . Second.',
+        'Published Date': '02 Sep 2024',
+    }
+
+
+def test_economist_takes_the_second_match():
+    response = page('https://www.economist.com/business/story', '''
+        <div class="css-b4a1pi"><span class="css-rjcumh">Business</span><span class="css-rjcumh">Headline</span></div>
+        <div class="css-1902i5q"><div class="css-1s3lugw"><a href="/a">A</a><a href="/b">B</a></div></div>
+        <time>Sep 1st 2024</time><time>Sep 2nd 2024</time>
+        <p data-component="paragraph">One.</p><p data-component="paragraph">Two.</p>
+    ''')
+    assert get_extractor('www.economist.com').extract(response) == {
+        'Title': 'Headline',
+        'Author Name': ['A', 'B'],
+        'Author URL': ['/a', '/b'],
+        'Article Content': 'One. Two.',
+        'Published Date': 'Sep 2nd 2024',
+    }
+
+
+def test_economist_missing_second_match_is_none():
+    response = page('https://www.economist.com/business/story', '<time>Sep 1st 2024</time>')
+    article = get_extractor('www.economist.com').extract(response)
+    assert article['Title'] is None
+    assert article['Published Date'] is None
+
+
+def test_livemint_joins_stripped_paragraphs():
+    response = page('https://www.livemint.com/market/story.html', '''
+        <h1>Sensex hits a record</h1>
+        <div class="storyPage_storyContent__m_MYl"><p>  One. </p><p> </p><p>Two.</p></div>
+    ''')
+    article = get_extractor('www.livemint.com').extract(response)
+    assert article['Title'] == 'Sensex hits a record'
+    assert article['Article Content'] == 'One. Two.'
+    assert article['Author Name'] is None
+
+
+def test_telegraph_date_post_processor():
+    response = page('https://www.telegraphindia.com/india/story/cid/1', '''
+        <h1>Headline</h1>
+        <div class="publishdate mt-32"><strong>Our Bureau</strong> Published 13.09.24, 07:18 AM</div>
+        <article id="contentbox"><p>Body.</p></article>
+    ''')
+    assert get_extractor('www.telegraphindia.com').extract(response) == {
+        'Title': 'Headline',
+        'Author Name': 'Our Bureau',
+        'Author URL': None,
+        'Article Content': 'Body.',
+        'Published Date': '13.09.24',
+    }
+
+
+def test_digitalterminal_author_url_is_absolute():
+    response = page('https://digitalterminal.in/tech/story', '''
+        <div data-test-id="author-name"><a href="/author/a-writer">A. Writer</a></div>
+        <time datetime="2024-09-02T10:30:00Z">2 Sep</time>
+    ''')
+    article = get_extractor('digitalterminal.in').extract(response)
+    assert article['Author URL'] == 'https://digitalterminal.in/author/a-writer'
+    assert article['Published Date'] == '2024-09-02T10:30:00Z'
+
+
+def json_ld(data):
+    return f'<script type="application/ld+json">{json.dumps(data)}</script>'
+
+
+def test_structured_values_are_post_processed():
+    response = page('https://digitalterminal.in/tech/story', json_ld({
+        '@type': 'NewsArticle',
+        'headline': 'Structured headline',
+        'author': {'@type': 'Person', 'name': 'A. Writer', 'url': '/author/a-writer'},
+        'datePublished': '2024-09-02T10:30:00Z',
+    }))
+    article = get_extractor('digitalterminal.in').extract(response)
+    assert article['Title'] == 'Structured headline'
+    assert article['Author URL'] == 'https://digitalterminal.in/author/a-writer'
+    assert article['Published Date'] == '2024-09-02T10:30:00Z'
+
+
+@pytest.mark.parametrize('domain, url, date_html, date', [
+    ('www.economist.com', 'https://www.economist.com/business/story',
+     '<time>Sep 1st 2024</time><time>Sep 2nd 2024</time>', 'Sep 2nd 2024'),
+    ('www.livemint.com', 'https://www.livemint.com/market/story.html',
+     '<div class="storyPage_date__JS9qJ"><span>Updated 2 Sep 2024, 10:30 AM IST</span></div>',
+     'Updated 2 Sep 2024, 10:30 AM IST'),
+])
+def test_structured_date_is_ignored(domain, url, date_html, date):
+    response = page(url, date_html + json_ld({
+        '@type': 'NewsArticle',
+        'headline': 'Structured headline',
+        'datePublished': '2024-09-02T10:30:00Z',
+    }))
+    article = get_extractor(domain).extract(response)
+    assert article['Title'] == 'Structured headline'
+    assert article['Published Date'] == date
+
+
+def test_custom_config_and_empty():
+    extractor = ArticleExtractor({'Title': ('css', 'h2::text', 'first', lambda value, response: value.upper())})
+    assert extractor.extract(page('https://example.com/', '<h2>hello</h2>'))['Title'] == 'HELLO'
+    assert ArticleExtractor.empty() == dict.fromkeys(FIELDS)
@@ -0,0 +1,160 @@
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+from scrapy.http import XmlResponse
+
+from common.feeds import FEED_ERRORS, follow_feed, iter_feed_entries, parse_date
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel>
+    <title>Latest</title>
+    <link>https://inc42.com/</link>
+    <item>
+      <title>One</title>
+      <link>https://inc42.com/buzz/one/</link>
+      <pubDate>Mon, 02 Sep 2024 10:30:00 +0000</pubDate>
+    </item>
+    <item>
+      <title>Two</title>
+      <link>https://inc42.com/buzz/two/</link>
+      <dc:date>2024-09-02T11:00:00Z</dc:date>
+    </item>
+    <item><title>No link</title></item>
+  </channel>
+</rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Latest</title>
+  <link href="https://www.economist.com/" rel="alternate"/>
+  <entry>
+    <title>One</title>
+    <link href="https://www.economist.com/business/one"/>
+    <updated>2024-09-02T10:30:00+00:00</updated>
+  </entry>
+  <entry>
+    <title>Two</title>
+    <link href="https://www.economist.com/business/two"/>
+    <published>2024-09-01T08:00:00Z</published>
+  </entry>
+</feed>"""
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+  <url>
+    <loc>https://www.livemint.com/market/one.html</loc>
+    <lastmod>2024-09-02T10:30:00+05:30</lastmod>
+  </url>
+  <url>
+    <loc>https://www.livemint.com/market/two.html</loc>
+    <news:news>
+      <news:publication_date>2024-09-02T09:00:00Z</news:publication_date>
+    </news:news>
+  </url>
+  <url>
+    <loc> https://www.livemint.com/market/three.html </loc>
+  </url>
+</urlset>"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap>
+    <loc>https://www.telegraphindia.com/sitemap-1.xml</loc>
+    <lastmod>2024-09-02</lastmod>
+  </sitemap>
+  <sitemap>
+    <loc>https://www.telegraphindia.com/sitemap-2.xml</loc>
+  </sitemap>
+</sitemapindex>"""
+
+
+def epoch(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def test_rss():
+    assert list(iter_feed_entries(RSS)) == [
+        ('article', 'https://inc42.com/buzz/one/', epoch(2024, 9, 2, 10, 30)),
+        ('article', 'https://inc42.com/buzz/two/', epoch(2024, 9, 2, 11, 0)),
+    ]
+
+
+def test_atom():
+    assert list(iter_feed_entries(ATOM)) == [
+        ('article', 'https://www.economist.com/business/one', epoch(2024, 9, 2, 10, 30)),
+        ('article', 'https://www.economist.com/business/two', epoch(2024, 9, 1, 8, 0)),
+    ]
+
+
+def test_sitemap():
+    assert list(iter_feed_entries(SITEMAP)) == [
+        ('article', 'https://www.livemint.com/market/one.html', epoch(2024, 9, 2, 5, 0)),
+        ('article', 'https://www.livemint.com/market/two.html', epoch(2024, 9, 2, 9, 0)),
+        ('article', 'https://www.livemint.com/market/three.html', None),
+    ]
+
+
+def test_sitemap_index():
+    assert list(iter_feed_entries(SITEMAP_INDEX)) == [
+        ('sitemap', 'https://www.telegraphindia.com/sitemap-1.xml', epoch(2024, 9, 2)),
+        ('sitemap', 'https://www.telegraphindia.com/sitemap-2.xml', None),
+    ]
+
+
+def test_gzipped_sitemap():
+    assert list(iter_feed_entries(gzip.compress(SITEMAP))) == list(iter_feed_entries(SITEMAP))
+
+
+def test_truncated_feed_yields_complete_entries():
+    body = RSS[:RSS.index(b'<item><title>No link')]
+    assert [url for _, url, _ in iter_feed_entries(body)] == [
+        'https://inc42.com/buzz/one/',
+        'https://inc42.com/buzz/two/',
+    ]
+
+
+@pytest.mark.parametrize('body', [b'not a feed', b'<html><body><p>Maintenance</p></body></html>'])
+def test_non_feed_yields_nothing(body):
+    assert list(iter_feed_entries(body)) == []
+
+
+@pytest.mark.parametrize('body', [b'', b'\x1f\x8b\x08\x00garbage', gzip.compress(SITEMAP)[:-20]])
+def test_malformed_feed_raises_feed_error(body):
+    with pytest.raises(FEED_ERRORS):
+        list(iter_feed_entries(body))
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2024-09-02T10:30:00Z', epoch(2024, 9, 2, 10, 30)),
+    ('2024-09-02', epoch(2024, 9, 2)),
+    ('Mon, 02 Sep 2024 10:30:00 GMT', epoch(2024, 9, 2, 10, 30)),
+    ('yesterday', None),
+    ('', None),
+    (None, None),
+])
+def test_parse_date(value, expected):
+    assert parse_date(value) == expected
+
+
+def test_follow_feed():
+    def article_callback(response):
+        pass
+
+    def feed_callback(response):
+        pass
+
+    response = XmlResponse('https://www.telegraphindia.com/sitemap.xml', body=SITEMAP_INDEX)
+    requests = list(follow_feed(response, article_callback, feed_callback))
+    assert [(r.url, r.callback) for r in requests] == [
+        ('https://www.telegraphindia.com/sitemap-1.xml', feed_callback),
+        ('https://www.telegraphindia.com/sitemap-2.xml', feed_callback),
+    ]
+
+    response = XmlResponse('https://www.livemint.com/sitemap/today.xml', body=SITEMAP)
+    requests = list(follow_feed(response, article_callback, feed_callback))
+    assert [r.callback for r in requests] == [article_callback] * 3
+    assert requests[0].meta['lastmod'] == epoch(2024, 9, 2, 5, 0)
+    assert 'lastmod' not in requests[2].meta
@@ -0,0 +1,36 @@
+from scrapy import Request, Spider
+from scrapy.utils.test import get_crawler
+
+from common.middlewares import HeaderProfileMiddleware
+
+URL = 'https://www.livemint.com/market/'
+
+
+def headers(settings=None, **request_headers):
+    mw = HeaderProfileMiddleware.from_crawler(get_crawler(Spider, settings))
+    request = Request(URL, headers=request_headers)
+    mw.process_request(request, None)
+    return request.headers
+
+
+def test_domain_gets_its_profile():
+    sent = headers()
+    assert b'Chrome/91' in sent[b'User-Agent']
+    assert b'Referer' not in sent
+
+
+def test_profile_override_by_setting():
+    sent = headers({'HEADER_PROFILE_DOMAINS': {'www.livemint.com': 'livemint'}})
+    assert b'Chrome/116' in sent[b'User-Agent']
+    assert sent[b'Referer'] == b'https://www.livemint.com/'
+
+
+def test_request_headers_win():
+    assert headers(**{'User-Agent': 'custom'})[b'User-Agent'] == b'custom'
+
+
+def test_unknown_domain_is_left_alone():
+    mw = HeaderProfileMiddleware.from_crawler(get_crawler(Spider))
+    request = Request('https://example.com/')
+    mw.process_request(request, None)
+    assert b'Accept-Language' not in request.headers
@@ -0,0 +1,120 @@
+import time
+from email.utils import formatdate
+
+import pytest
+from scrapy import Spider
+from scrapy.http import Request, Response
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from common.httpcache import ListingRevalidatePolicy
+from common.middlewares import SeenUrlMiddleware
+
+ARTICLE_URL = 'https://inc42.com/buzz/story/'
+LISTING_URL = 'https://inc42.com/buzz/page/1/'
+
+
+def parse_article(response):
+    pass
+
+
+def parse(response):
+    pass
+
+
+def policy(**settings):
+    return ListingRevalidatePolicy(Settings(settings))
+
+
+def article_request(**meta):
+    return Request(ARTICLE_URL, callback=parse_article, meta=meta)
+
+
+def listing_request(**meta):
+    return Request(LISTING_URL, callback=parse, meta=meta)
+
+
+def response(url=ARTICLE_URL, status=200, age=0, **headers):
+    headers.setdefault('Date', formatdate(time.time() - age, usegmt=True))
+    return Response(url, status=status, headers=headers)
+
+
+def test_article_is_fresh_indefinitely():
+    assert policy().is_cached_response_fresh(response(age=365 * 86400), article_request())
+
+
+def test_article_expiration_setting():
+    p = policy(HTTPCACHE_ARTICLE_EXPIRATION_SECS=3600)
+    assert p.is_cached_response_fresh(response(age=60), article_request())
+    assert not p.is_cached_response_fresh(response(age=7200), article_request())
+
+
+def test_refresh_cache_meta():
+    assert not policy().is_cached_response_fresh(response(), article_request(refresh_cache=True))
+
+
+def test_feed_lastmod_newer_than_cached_copy():
+    p = policy()
+    cached = response(age=3600)
+    assert not p.is_cached_response_fresh(cached, article_request(lastmod=time.time() - 60))
+    assert p.is_cached_response_fresh(cached, article_request(lastmod=time.time() - 7200))
+
+
+@pytest.mark.parametrize('status', [301, 404, 503])
+def test_cached_article_error_is_not_fresh(status):
+    assert not policy().is_cached_response_fresh(response(status=status), article_request())
+
+
+@pytest.mark.parametrize('status, cached', [(200, True), (301, False), (404, False), (503, False)])
+def test_only_200_articles_are_stored(status, cached):
+    assert policy().should_cache_response(response(status=status), article_request()) is cached
+
+
+def test_article_no_store():
+    assert not policy().should_cache_response(response(**{'Cache-Control': 'no-store'}), article_request())
+
+
+def test_article_stored_despite_max_age_zero():
+    assert policy().should_cache_response(response(**{'Cache-Control': 'max-age=0'}), article_request())
+
+
+def test_listing_is_revalidated_with_validators():
+    cached = response(LISTING_URL, ETag='"abc"', **{'Last-Modified': 'Mon, 02 Sep 2024 10:30:00 GMT',
+                                                     'Cache-Control': 'max-age=86400'})
+    request = listing_request()
+    assert not policy().is_cached_response_fresh(cached, request)
+    assert request.headers[b'If-None-Match'] == b'"abc"'
+    assert request.headers[b'If-Modified-Since'] == b'Mon, 02 Sep 2024 10:30:00 GMT'
+
+
+def test_listing_not_modified():
+    p = policy()
+    request = listing_request()
+    cached = response(LISTING_URL, ETag='"abc"')
+    assert p.is_cached_response_valid(cached, response(LISTING_URL, status=304), request)
+    assert request.meta['not_modified'] is True
+
+    request = listing_request()
+    assert not p.is_cached_response_valid(cached, response(LISTING_URL, status=200), request)
+    assert 'not_modified' not in request.meta
+
+
+def test_seen_index_ttl_refetch_bypasses_the_cache(tmp_path):
+    crawler = get_crawler(Spider, {'SEEN_INDEX_ENABLED': True, 'SEEN_INDEX_TTL': 3600,
+                                   'SEEN_INDEX_PATH': str(tmp_path / 'seen.sqlite')})
+    spider = Spider('inc42')
+    seen = SeenUrlMiddleware.from_crawler(crawler)
+    seen.spider_opened(spider)
+    seen.index.add(ARTICLE_URL, scraped_at=time.time() - 7200)
+    seen.index.add(ARTICLE_URL + 'recent', scraped_at=time.time() - 60)
+
+    new = Request(ARTICLE_URL + 'new', callback=parse_article)
+    expired = Request(ARTICLE_URL, callback=parse_article)
+    recent = Request(ARTICLE_URL + 'recent', callback=parse_article)
+    assert list(seen.process_spider_output(None, [new, expired, recent], spider)) == [new, expired]
+    seen.spider_closed(spider)
+
+    # The copy cached when the article was last scraped is not served again
+    p = policy()
+    assert not p.is_cached_response_fresh(response(age=7200), expired)
+    assert p.is_cached_response_fresh(response(age=7200), new)
@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+
+import pytest
+
+from common import monitor
+from common.monitor import render_metrics
+
+
+class Stats:
+    def __init__(self, values):
+        self.values = values
+
+    def get_stats(self, spider=None):
+        return self.values
+
+
+def crawler(name, stats, engine=None, driver_pool=None):
+    spider = SimpleNamespace(name=name)
+    if driver_pool is not None:
+        spider.driver_pool = driver_pool
+    return SimpleNamespace(spider=spider, stats=Stats(stats), engine=engine)
+
+
+def engine(domains):
+    slots = {domain: SimpleNamespace(transferring=set(range(active)), queue=[None] * queued,
+                                     concurrency=concurrency, delay=delay)
+             for domain, (active, queued, concurrency, delay) in domains.items()}
+    return SimpleNamespace(
+        slot=SimpleNamespace(scheduler=[None] * 7, inprogress={1, 2}),
+        scraper=SimpleNamespace(slot=SimpleNamespace(active={1}, itemproc_size=3)),
+        downloader=SimpleNamespace(slots=slots),
+    )
+
+
+@pytest.fixture(autouse=True)
+def fixed_rss(monkeypatch):
+    monkeypatch.setattr(monitor, 'rss_bytes', lambda: 1048576)
+
+
+def parse(text):
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith('#'):
+            series, value = line.rsplit(' ', 1)
+            samples[series] = float(value)
+    return samples
+
+
+def test_only_the_process_family_without_crawlers():
+    assert render_metrics([]) == (
+        '# HELP process_resident_memory_bytes Resident memory of the crawl process\n'
+        '# TYPE process_resident_memory_bytes gauge\n'
+        'process_resident_memory_bytes 1048576.0\n'
+    )
+
+
+def test_stats_are_rendered_as_untyped_samples():
+    text = render_metrics([crawler('inc42', {
+        'spider/articles_scraped': 12,
+        'downloader/response_status_count/200': 30,
+        'start_time': 'not a number',
+        'finish_reason': 'finished',
+    })])
+    lines = text.splitlines()
+    assert lines[:2] == [
+        '# HELP scrapy_stat Numeric values from the crawler stats collector, including the spider/* counters',
+        '# TYPE scrapy_stat untyped',
+    ]
+    assert parse(text) == {
+        'scrapy_stat{spider="inc42",stat="spider/articles_scraped"}': 12.0,
+        'scrapy_stat{spider="inc42",stat="downloader/response_status_count/200"}': 30.0,
+        'process_resident_memory_bytes': 1048576.0,
+    }
+    assert text.endswith('\n')
+
+
+def test_engine_and_downloader_gauges():
+    text = render_metrics([crawler('livemint', {}, engine({'www.livemint.com': (2, 5, 8, 0.25)}))])
+    samples = parse(text)
+    assert samples['scrapy_scheduler_queue_depth{spider="livemint"}'] == 7
+    assert samples['scrapy_engine_in_progress{spider="livemint"}'] == 2
+    assert samples['scrapy_scraper_active_responses{spider="livemint"}'] == 1
+    assert samples['scrapy_item_pipeline_active{spider="livemint"}'] == 3
+    labels = '{spider="livemint",domain="www.livemint.com"}'
+    assert samples[f'scrapy_downloader_in_flight{labels}'] == 2
+    assert samples[f'scrapy_downloader_queued{labels}'] == 5
+    assert samples[f'scrapy_downloader_concurrency{labels}'] == 8
+    assert samples[f'scrapy_downloader_delay_seconds{labels}'] == 0.25
+    assert '# TYPE scrapy_downloader_in_flight gauge' in text.splitlines()
+
+
+def test_families_are_grouped_across_crawlers():
+    text = render_metrics([
+        crawler('inc42', {'item_scraped_count': 1}),
+        crawler('economist', {'item_scraped_count': 2}),
+    ])
+    lines = text.splitlines()
+    assert lines.count('# TYPE scrapy_stat untyped') == 1
+    start = lines.index('# TYPE scrapy_stat untyped')
+    assert lines[start + 1:start + 3] == [
+        'scrapy_stat{spider="inc42",stat="item_scraped_count"} 1.0',
+        'scrapy_stat{spider="economist",stat="item_scraped_count"} 2.0',
+    ]
+
+
+def test_webdriver_pool():
+    pool = SimpleNamespace(size=4, in_use=1, launched=6, recycled=2)
+    text = render_metrics([crawler('dt', {}, engine({}), driver_pool=pool)])
+    samples = parse(text)
+    assert samples['webdriver_pool_size{spider="dt"}'] == 4
+    assert samples['webdriver_pool_launched_total{spider="dt"}'] == 6
+    assert '# TYPE webdriver_pool_recycled_total counter' in text.splitlines()
+
+
+def test_label_values_are_escaped():
+    text = render_metrics([crawler('dt', {'weird"stat\\name\n': 1})])
+    assert 'scrapy_stat{spider="dt",stat="weird\\"stat\\\\name\\n"} 1.0' in text.splitlines()
+
+
+def test_crawler_not_yet_started_is_skipped():
+    not_started = SimpleNamespace(spider=None, stats=Stats({'x': 1}), engine=None)
+    assert parse(render_metrics([not_started])) == {'process_resident_memory_bytes': 1048576.0}
@@ -0,0 +1,69 @@
+import pytest
+
+from common.pagination import Paginator, page_number, page_url
+
+
+@pytest.mark.parametrize('url, page, next_url', [
+    ('https://www.economist.com/business?page=2', 2, 'https://www.economist.com/business?page=3'),
+    ('https://www.economist.com/business?sort=new&page=1', 1, 'https://www.economist.com/business?sort=new&page=2'),
+    ('https://www.livemint.com/market/ipo/page-1', 1, 'https://www.livemint.com/market/ipo/page-2'),
+    ('https://www.telegraphindia.com/india/page-9/', 9, 'https://www.telegraphindia.com/india/page-10/'),
+    ('https://inc42.com/industry/fintech/page/1/', 1, 'https://inc42.com/industry/fintech/page/2/'),
+])
+def test_page_urls(url, page, next_url):
+    assert page_number(url) == page
+    assert page_url(url, page + 1) == next_url
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.livemint.com/politics',
+    'https://www.livemint.com/news/page-one-story-11725261234.html',
+    'https://www.livemint.com/topic/page-3-ads',
+])
+def test_urls_without_pages(url):
+    assert page_number(url) is None
+    assert page_url(url, 2) is None
+    assert Paginator(5).next_page(url, ['https://www.livemint.com/a']) is None
+
+
+def links(*ids):
+    return [f'https://inc42.com/buzz/{i}/' for i in ids]
+
+
+def test_follows_until_max_pages():
+    paginator = Paginator(max_pages=3)
+    assert paginator.next_page('https://inc42.com/buzz/page/1/', links(1, 2)) == 'https://inc42.com/buzz/page/2/'
+    assert paginator.next_page('https://inc42.com/buzz/page/2/', links(3, 4)) == 'https://inc42.com/buzz/page/3/'
+    assert paginator.next_page('https://inc42.com/buzz/page/3/', links(5, 6)) is None
+
+
+def test_default_is_a_single_page():
+    assert Paginator().next_page('https://inc42.com/buzz/page/1/', links(1)) is None
+
+
+def test_stops_when_a_page_adds_nothing_new():
+    paginator = Paginator(max_pages=10)
+    paginator.next_page('https://inc42.com/buzz/page/1/', links(1, 2))
+    # The site serves the last page again for out-of-range page numbers
+    assert paginator.next_page('https://inc42.com/buzz/page/2/', links(1, 2)) is None
+
+
+def test_empty_page_stops():
+    assert Paginator(max_pages=10).next_page('https://inc42.com/buzz/page/1/', []) is None
+
+
+def test_sections_are_tracked_separately():
+    paginator = Paginator(max_pages=10)
+    paginator.next_page('https://inc42.com/buzz/page/1/', links(1, 2))
+    # Same stories listed in another section still count as new there
+    assert paginator.next_page('https://inc42.com/features/page/1/', links(1, 2)) == \
+        'https://inc42.com/features/page/2/'
+
+
+def test_fresh_paginator_follows_previously_scraped_links():
+    # Exhaustion only looks at this run's listings; articles scraped on an
+    # earlier run (the seen index) don't stop the section after page 1
+    first_run = Paginator(max_pages=3)
+    first_run.next_page('https://inc42.com/buzz/page/1/', links(1, 2))
+    second_run = Paginator(max_pages=3)
+    assert second_run.next_page('https://inc42.com/buzz/page/1/', links(1, 2)) == 'https://inc42.com/buzz/page/2/'
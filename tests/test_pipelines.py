@@ -0,0 +1,156 @@
+import json
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from twisted.internet import defer
+
+from common import pipelines
+from common.pipelines import BufferedWriterPipeline
+
+
+@pytest.fixture
+def spider(tmp_path):
+    return SimpleNamespace(name='inc42', output_file=str(tmp_path / 'inc42.json'),
+                           logger=logging.getLogger('inc42'))
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    # No reactor runs in these tests: do the thread-pool work synchronously,
+    # remembering which pool it was meant for
+    used = []
+
+    def run_now(reactor, pool, f, *args):
+        used.append(pool)
+        return defer.maybeDeferred(f, *args)
+
+    monkeypatch.setattr(pipelines, 'deferToThreadPool', run_now)
+    return used
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_items_are_written_and_legacy_file_rebuilt(spider, pools, tmp_path):
+    pipeline = BufferedWriterPipeline(batch_size=3, flush_interval=60)
+    pipeline.open_spider(spider)
+    items = [{'Article URL': f'https://inc42.com/{n}/', 'Response Code': 200} for n in range(7)]
+    for item in items:
+        assert pipeline.process_item(item, spider) is item
+
+    results = []
+    pipeline.close_spider(spider).addBoth(results.append)
+    assert results == [None]
+    assert not pipeline.wait_pool.started
+    assert read_jsonl(tmp_path / 'inc42.jsonl') == items
+    with open(spider.output_file) as f:
+        assert json.load(f) == items
+
+
+def test_full_batches_are_flushed_before_close(spider, pools, tmp_path):
+    pipeline = BufferedWriterPipeline(batch_size=2, flush_interval=60)
+    pipeline.open_spider(spider)
+    for n in range(5):
+        pipeline.process_item({'n': n}, spider)
+    wait_for(lambda: len(read_jsonl(tmp_path / 'inc42.jsonl')) == 4)
+    pipeline.close_spider(spider)
+    assert read_jsonl(tmp_path / 'inc42.jsonl') == [{'n': n} for n in range(5)]
+
+
+def test_partial_batch_is_flushed_after_the_interval(spider, pools, tmp_path):
+    pipeline = BufferedWriterPipeline(batch_size=100, flush_interval=0.05)
+    pipeline.open_spider(spider)
+    pipeline.process_item({'n': 0}, spider)
+    wait_for(lambda: read_jsonl(tmp_path / 'inc42.jsonl') == [{'n': 0}])
+    pipeline.close_spider(spider)
+
+
+def test_full_queue_waits_in_a_thread_pool(spider, pools, tmp_path):
+    pipeline = BufferedWriterPipeline(batch_size=1, flush_interval=60, queue_size=1)
+    pipeline.open_spider(spider)
+    # Hold the writer on its first batch so the queue fills up
+    released = threading.Event()
+    write_many = pipeline.writer.write_many
+
+    def slow_write_many(items):
+        released.wait(5)
+        write_many(items)
+
+    pipeline.writer.write_many = slow_write_many
+
+    assert pipeline.process_item({'n': 0}, spider) == {'n': 0}
+    wait_for(pipeline.queue.empty)
+    assert pipeline.process_item({'n': 1}, spider) == {'n': 1}
+    assert pools == []
+
+    # The queue is full: the put goes to a thread pool and the item comes
+    # back as a Deferred firing once there was room
+    threading.Timer(0.1, released.set).start()
+    d = pipeline.process_item({'n': 2}, spider)
+    assert isinstance(d, defer.Deferred)
+    # ...the pipeline's own pool, never the reactor's shared one
+    assert pools == [pipeline.wait_pool]
+    fired = []
+    d.addCallback(fired.append)
+    assert fired == [{'n': 2}]
+
+    pipeline.close_spider(spider)
+    assert read_jsonl(tmp_path / 'inc42.jsonl') == [{'n': n} for n in range(3)]
+
+
+def test_write_failure_is_logged_and_raised(spider, pools, caplog):
+    pipeline = BufferedWriterPipeline(batch_size=1, flush_interval=60)
+    pipeline.open_spider(spider)
+    with caplog.at_level(logging.ERROR, logger='common.pipelines'):
+        pipeline.process_item({'n': 0, 'unserialisable': object()}, spider)
+        wait_for(lambda: pipeline.error is not None)
+    assert isinstance(pipeline.error, TypeError)
+    assert 'Failed to write 1 items' in caplog.text
+
+    with pytest.raises(TypeError):
+        pipeline.process_item({'n': 1}, spider)
+
+    failures = []
+    pipeline.close_spider(spider).addErrback(failures.append)
+    assert len(failures) == 1 and failures[0].check(TypeError)
+    assert not pipeline.wait_pool.started
+
+
+def test_failed_writer_keeps_draining_the_queue(spider, pools, tmp_path):
+    pipeline = BufferedWriterPipeline(batch_size=1, flush_interval=60, queue_size=1)
+    pipeline.open_spider(spider)
+    released = threading.Event()
+    write_many = pipeline.writer.write_many
+
+    def slow_write_many(items):
+        released.wait(5)
+        write_many(items)
+
+    pipeline.writer.write_many = slow_write_many
+
+    pipeline.process_item({'n': 0, 'unserialisable': object()}, spider)
+    wait_for(pipeline.queue.empty)
+    pipeline.process_item({'n': 1}, spider)
+    # The first batch fails while this item waits for room; it must still
+    # get into the queue rather than block the pool thread forever
+    threading.Timer(0.1, released.set).start()
+    fired = []
+    pipeline.process_item({'n': 2}, spider).addCallback(fired.append)
+    assert fired == [{'n': 2}]
+
+    failures = []
+    pipeline.close_spider(spider).addErrback(failures.append)
+    assert failures[0].check(TypeError)
+    assert read_jsonl(tmp_path / 'inc42.jsonl') == [{'n': 1}, {'n': 2}]
@@ -0,0 +1,101 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import run
+from common.pipelines import QueueSinkPipeline
+
+
+def test_merge_stats():
+    per_spider = {
+        'inc42': {'total_requests': 10, 'articles_scraped': 8, 'response_codes': {'200': 8, '404': 2},
+                  'errors': ['inc42: timeout']},
+        'economist': {'total_requests': 5, 'articles_scraped': 5, 'response_codes': {'200': 5},
+                      'errors': [], 'elapsed': 1.5},
+    }
+    assert run.merge_stats(per_spider) == {
+        'total_requests': 15,
+        'articles_scraped': 13,
+        'response_codes': {'200': 13, '404': 2},
+        'errors': ['inc42: timeout'],
+        'elapsed': 1.5,
+        'per_spider': per_spider,
+    }
+
+
+def test_merge_stats_of_nothing():
+    assert run.merge_stats({}) == {'per_spider': {}}
+
+
+def fake_worker(name, item_sink, results, concurrency, spider_kwargs, *rest):
+    # Stands in for run_worker in the spawned children: no crawl, just the
+    # messages a finished crawl sends back
+    if name == 'crashed':
+        raise SystemExit(1)
+    for n in range(spider_kwargs.get('items', 2)):
+        item_sink.put((name, {'Article URL': f'https://{name}/{n}', 'concurrency': concurrency}))
+    results.put((name, {'articles_scraped': spider_kwargs.get('items', 2), 'response_codes': {'200': 1},
+                        'errors': [f'{name} error']}))
+    item_sink.put((name, None))
+
+
+@pytest.fixture
+def fake_workers(monkeypatch):
+    monkeypatch.setattr(run, 'run_worker', fake_worker)
+
+
+def test_crawl_parallel_merges_items_and_stats(fake_workers, tmp_path):
+    output_file = str(tmp_path / 'all.jsonl')
+    stats_file = str(tmp_path / 'stats.json')
+    combined = run.crawl_parallel(['inc42', 'economist'], concurrency=8,
+                                  spider_kwargs={'economist': {'items': 3}},
+                                  output_file=output_file, stats_file=stats_file)
+
+    with open(output_file) as f:
+        items = [json.loads(line) for line in f]
+    assert sorted(item['Article URL'] for item in items) == \
+        ['https://economist/0', 'https://economist/1', 'https://economist/2',
+         'https://inc42/0', 'https://inc42/1']
+    # The concurrency budget is split between the workers
+    assert {item['concurrency'] for item in items} == {4}
+
+    assert combined['articles_scraped'] == 5
+    assert combined['response_codes'] == {'200': 2}
+    assert sorted(combined['errors']) == ['economist error', 'inc42 error']
+    assert set(combined['per_spider']) == {'inc42', 'economist'}
+    with open(stats_file) as f:
+        assert json.load(f) == combined
+
+
+def test_crawl_parallel_survives_a_crashed_worker(fake_workers, tmp_path):
+    combined = run.crawl_parallel(['inc42', 'crashed'], output_file=str(tmp_path / 'all.jsonl'),
+                                  stats_file=str(tmp_path / 'stats.json'))
+    assert combined['articles_scraped'] == 2
+    assert set(combined['per_spider']) == {'inc42'}
+
+
+class Sink:
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+
+def test_queue_sink_pipeline():
+    sink = Sink()
+    spider = SimpleNamespace(name='inc42', item_sink=sink)
+    pipeline = QueueSinkPipeline()
+    pipeline.open_spider(spider)
+    item = {'Title': 'One'}
+    assert pipeline.process_item(item, spider) is item
+    assert sink.items == [('inc42', {'Title': 'One'})]
+
+
+def test_queue_sink_pipeline_without_a_sink():
+    spider = SimpleNamespace(name='inc42')
+    pipeline = QueueSinkPipeline()
+    pipeline.open_spider(spider)
+    item = {'Title': 'One'}
+    assert pipeline.process_item(item, spider) is item
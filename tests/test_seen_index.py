@@ -0,0 +1,185 @@
+import json
+import time
+
+import pytest
+from scrapy import Request, Spider
+from scrapy.exceptions import NotConfigured
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from common.middlewares import SeenUrlMiddleware
+from common.seen_index import SeenUrlIndex
+
+URL = 'https://inc42.com/buzz/story/'
+
+
+def parse_article(response):
+    pass
+
+
+def parse(response):
+    pass
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'seen.sqlite')
+
+
+def test_persists_across_runs(path):
+    index = SeenUrlIndex(path, 'inc42')
+    index.add(URL)
+    assert URL in index
+    index.close()
+
+    index = SeenUrlIndex(path, 'inc42')
+    assert URL in index
+    assert len(index) == 1
+    index.close()
+
+
+def test_urls_are_canonicalized(path):
+    index = SeenUrlIndex(path, 'inc42')
+    index.add('https://inc42.com/buzz/story/?b=2&a=1#comments')
+    assert 'https://inc42.com/buzz/story/?a=1&b=2' in index
+    index.close()
+
+
+def test_spiders_are_kept_apart(path):
+    index = SeenUrlIndex(path, 'inc42')
+    index.add(URL)
+    index.close()
+    other = SeenUrlIndex(path, 'economist')
+    assert URL not in other
+    assert len(other) == 0
+    other.close()
+
+
+def test_rows_are_written_in_batches(path):
+    index = SeenUrlIndex(path, 'inc42', batch_size=2)
+    index.add(URL + '1')
+    assert len(SeenUrlIndex(path, 'inc42')) == 0
+    index.add(URL + '2')
+    assert len(SeenUrlIndex(path, 'inc42')) == 2
+    index.close()
+
+
+def test_ttl(path):
+    index = SeenUrlIndex(path, 'inc42', ttl=3600)
+    index.add(URL + 'old', scraped_at=time.time() - 7200)
+    index.add(URL + 'new', scraped_at=time.time() - 60)
+    assert URL + 'old' not in index
+    assert URL + 'new' in index
+    assert index.is_expired(URL + 'old')
+    assert not index.is_expired(URL + 'new')
+    assert not index.is_expired(URL + 'never')
+    index.close()
+
+
+def test_nothing_expires_without_a_ttl(path):
+    index = SeenUrlIndex(path, 'inc42')
+    index.add(URL, scraped_at=1000.0)
+    assert not index.is_expired(URL)
+    index.close()
+
+
+def test_newer_lastmod_counts_as_unseen(path):
+    index = SeenUrlIndex(path, 'inc42')
+    index.add(URL, scraped_at=1000.0)
+    assert index.is_seen(URL, lastmod=900.0)
+    assert not index.is_seen(URL, lastmod=1100.0)
+    index.close()
+
+
+def articles():
+    return [
+        {'Response Code': 200, 'Article URL': URL + '1'},
+        {'Response Code': 404, 'Article URL': URL + '2'},
+        {'Response Code': 200, 'Article URL': None},
+    ]
+
+
+def test_seed_from_jsonl_output(path, tmp_path):
+    with open(tmp_path / 'inc42.jsonl', 'w') as f:
+        f.writelines(json.dumps(article) + '\n' for article in articles())
+    index = SeenUrlIndex(path, 'inc42')
+    index.seed_from_output(str(tmp_path / 'inc42.json'))
+    assert URL + '1' in index
+    assert URL + '2' not in index
+    assert len(index) == 1
+    index.close()
+
+
+def test_seed_from_legacy_json_output(path, tmp_path):
+    with open(tmp_path / 'inc42.json', 'w') as f:
+        json.dump(articles(), f)
+    index = SeenUrlIndex(path, 'inc42')
+    index.seed_from_output(str(tmp_path / 'inc42.json'))
+    assert len(index) == 1 and URL + '1' in index
+    index.close()
+
+
+def test_seed_from_missing_or_broken_output(path, tmp_path):
+    index = SeenUrlIndex(path, 'inc42')
+    index.seed_from_output(str(tmp_path / 'missing.json'))
+    (tmp_path / 'broken.json').write_text('[{"Response')
+    index.seed_from_output(str(tmp_path / 'broken.json'))
+    assert len(index) == 0
+    index.close()
+
+
+@pytest.fixture
+def middleware(path, tmp_path):
+    def make(**settings):
+        crawler = get_crawler(Spider, {'SEEN_INDEX_ENABLED': True, 'SEEN_INDEX_PATH': path, **settings})
+        spider = Spider('inc42')
+        spider.output_file = str(tmp_path / 'inc42.json')
+        mw = SeenUrlMiddleware.from_crawler(crawler)
+        mw.spider_opened(spider)
+        return mw, crawler, spider
+    return make
+
+
+def test_middleware_not_configured():
+    with pytest.raises(NotConfigured):
+        SeenUrlMiddleware(get_crawler(Spider, {'SEEN_INDEX_ENABLED': False}))
+
+
+def test_middleware_drops_seen_articles_only(middleware):
+    mw, crawler, spider = middleware()
+    mw.index.add(URL)
+    listing = Request('https://inc42.com/buzz/page/2/', callback=parse)
+    seen = Request(URL, callback=parse_article)
+    new = Request(URL + 'new', callback=parse_article)
+    item = {'Article URL': URL}
+    output = list(mw.process_spider_output(None, [listing, seen, new, item], spider))
+    assert output == [listing, new, item]
+    assert crawler.stats.get_value('seen_index/skipped') == 1
+    mw.spider_closed(spider)
+
+
+def test_middleware_records_article_responses(middleware, path):
+    mw, _, spider = middleware()
+    for url, status in ((URL + '1', 200), (URL + '2', 404)):
+        request = Request(url, callback=parse_article)
+        mw.process_spider_input(HtmlResponse(url, status=status, request=request), spider)
+    # Redirected articles are recorded under the URL that was requested too
+    request = Request(URL + '3', callback=parse_article, meta={'redirect_urls': [URL + 'old']})
+    mw.process_spider_input(HtmlResponse(URL + '3', request=request), spider)
+    # Listings are never recorded
+    request = Request(URL + 'page/2/', callback=parse)
+    mw.process_spider_input(HtmlResponse(URL + 'page/2/', request=request), spider)
+    mw.spider_closed(spider)
+
+    index = SeenUrlIndex(path, 'inc42')
+    assert {url for url in (URL + '1', URL + '2', URL + '3', URL + 'old', URL + 'page/2/') if url in index} == \
+        {URL + '1', URL + '3', URL + 'old'}
+    index.close()
+
+
+def test_middleware_seeds_an_empty_index(middleware, tmp_path):
+    with open(tmp_path / 'inc42.json', 'w') as f:
+        json.dump(articles(), f)
+    mw, _, spider = middleware()
+    assert URL + '1' in mw.index
+    mw.spider_closed(spider)
@@ -0,0 +1,105 @@
+import json
+
+import lxml.html
+import pytest
+
+from common.structured import MIN_BODY_CHARS, find_article, structured_fields, text_of
+
+BODY = 'Markets rallied on Monday. ' * 20
+
+
+def page(*scripts):
+    return lxml.html.fromstring('<html><head>{}</head><body><h1>Page</h1></body></html>'.format(''.join(scripts)))
+
+
+def json_ld(data):
+    return f'<script type="application/ld+json">{json.dumps(data)}</script>'
+
+
+def next_data(data):
+    return f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+
+
+def test_json_ld_article():
+    root = page(json_ld({
+        '@context': 'https://schema.org',
+        '@graph': [
+            {'@type': 'WebSite', 'name': 'Mint'},
+            {
+                '@type': ['NewsArticle'],
+                'headline': ' Sensex  hits a record ',
+                'datePublished': '2024-09-02T10:30:00+05:30',
+                'author': [{'name': 'A. Writer', 'url': 'https://www.livemint.com/authors/a-writer'}, 'B. Writer'],
+                'articleBody': '<p>Markets <b>rallied</b></p>\n<p>on Monday.</p>',
+            },
+        ],
+    }))
+    assert structured_fields(root, ['json-ld']) == {
+        'Title': 'Sensex hits a record',
+        'Author Name': ['A. Writer', 'B. Writer'],
+        'Author URL': ['https://www.livemint.com/authors/a-writer'],
+        'Published Date': '2024-09-02T10:30:00+05:30',
+        'Article Content': 'Markets rallied on Monday.',
+    }
+
+
+def test_only_present_fields_are_returned():
+    root = page(json_ld({'@type': 'Article', 'headline': 'Just a title'}))
+    assert structured_fields(root, ['json-ld']) == {'Title': 'Just a title'}
+
+
+def test_next_data_story():
+    root = page(next_data({'props': {'pageProps': {'story': {
+        'headline': 'Startup raises funding',
+        'authors': [{'name': 'C. Writer'}],
+        'content': BODY,
+    }}}}))
+    fields = structured_fields(root, ['next-data'])
+    assert fields['Title'] == 'Startup raises funding'
+    assert fields['Author Name'] == ['C. Writer']
+    assert fields['Article Content'] == BODY.strip()
+
+
+def test_next_data_listing_is_not_an_article():
+    stories = [{'headline': f'Story {n}', 'body': BODY} for n in range(3)]
+    root = page(next_data({'props': {'pageProps': {'stories': stories}}}))
+    assert find_article(root, ['next-data']) is None
+
+
+def test_next_data_teaser_is_not_an_article():
+    root = page(next_data({'props': {'pageProps': {'story': {
+        'headline': 'Teaser', 'body': 'x' * (MIN_BODY_CHARS - 1),
+    }}}}))
+    assert find_article(root, ['next-data']) is None
+
+
+def test_sources_are_tried_in_order():
+    root = page(
+        json_ld({'@type': 'NewsArticle', 'headline': 'From JSON-LD'}),
+        next_data({'story': {'headline': 'From Next.js', 'body': BODY}}),
+    )
+    assert find_article(root, ['json-ld', 'next-data'])['headline'] == 'From JSON-LD'
+    assert find_article(root, ['next-data', 'json-ld'])['headline'] == 'From Next.js'
+    assert find_article(root, []) is None
+
+
+def test_invalid_json_is_skipped():
+    root = page(
+        '<script type="application/ld+json">{"@type": "NewsArticle",</script>',
+        json_ld({'@type': 'NewsArticle', 'headline': 'Valid'}),
+    )
+    assert find_article(root, ['json-ld'])['headline'] == 'Valid'
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('  plain \n text ', 'plain text'),
+    ('<p>Hello <em>world</em></p>', 'Hello world'),
+    ('1 < 2', '1 < 2'),
+    ('<!-- only a comment -->', None),
+    ('<p>   </p>', None),
+    ('', None),
+    (None, None),
+    (42, None),
+])
+def test_text_of(value, expected):
+    assert text_of(value) == expected
@@ -0,0 +1,145 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Request, Response
+from scrapy.utils.test import get_crawler
+
+from common.throttle import AdaptiveConcurrency
+
+DOMAIN = 'inc42.com'
+
+
+@pytest.fixture
+def setup(tmp_path):
+    def make(**settings):
+        settings = {
+            'ADAPTIVE_CONCURRENCY_ENABLED': True,
+            'ADAPTIVE_WINDOW': 4,
+            'ADAPTIVE_TARGET_LATENCY': 1.0,
+            'ADAPTIVE_ERROR_THRESHOLD': 0.25,
+            'ADAPTIVE_MIN_CONCURRENCY': 1,
+            'ADAPTIVE_MAX_CONCURRENCY': 10,
+            'ADAPTIVE_MAX_DELAY': 5.0,
+            'ADAPTIVE_DELAY_STEP': 0.5,
+            'ADAPTIVE_STATE_FILE': str(tmp_path / 'adaptive_limits.json'),
+            **settings,
+        }
+        crawler = get_crawler(settings_dict=settings)
+        slot = SimpleNamespace(concurrency=4, delay=1.0)
+        crawler.engine = SimpleNamespace(downloader=SimpleNamespace(slots={DOMAIN: slot}))
+        return AdaptiveConcurrency(crawler), crawler, slot
+    return make
+
+
+def respond(ext, status=200, latency=0.1):
+    request = Request(f'https://{DOMAIN}/buzz/', meta={'download_slot': DOMAIN, 'download_latency': latency})
+    ext.response_downloaded(Response(request.url, status=status), request, None)
+
+
+def test_not_configured_when_disabled():
+    with pytest.raises(NotConfigured):
+        AdaptiveConcurrency(get_crawler(settings_dict={'ADAPTIVE_CONCURRENCY_ENABLED': False}))
+
+
+def test_additive_increase_after_a_healthy_window(setup):
+    ext, crawler, slot = setup()
+    for _ in range(3):
+        respond(ext)
+    assert (slot.concurrency, slot.delay) == (4, 1.0)
+    respond(ext)
+    assert (slot.concurrency, slot.delay) == (5, 0.5)
+    for _ in range(8):
+        respond(ext)
+    assert (slot.concurrency, slot.delay) == (7, 0.0)
+    assert crawler.stats.get_value(f'adaptive/{DOMAIN}/concurrency') == 7
+
+
+def test_increase_is_capped(setup):
+    ext, _, slot = setup(ADAPTIVE_MAX_CONCURRENCY=5, ADAPTIVE_MIN_DELAY=0.25)
+    for _ in range(12):
+        respond(ext)
+    assert (slot.concurrency, slot.delay) == (5, 0.25)
+
+
+def test_multiplicative_decrease_on_latency(setup):
+    ext, _, slot = setup()
+    for _ in range(4):
+        respond(ext, latency=2.0)
+    assert (slot.concurrency, slot.delay) == (2, 2.0)
+    for _ in range(8):
+        respond(ext, latency=2.0)
+    assert (slot.concurrency, slot.delay) == (1, 5.0)
+
+
+def test_decrease_from_zero_delay_uses_step(setup):
+    ext, _, slot = setup()
+    slot.delay = 0.0
+    for _ in range(4):
+        respond(ext, latency=2.0)
+    assert slot.delay == 0.5
+
+
+def test_backoff_status_decreases_once_per_window(setup):
+    ext, crawler, slot = setup()
+    respond(ext, status=503)
+    assert (slot.concurrency, slot.delay) == (2, 2.0)
+    respond(ext, status=429)
+    respond(ext)
+    respond(ext)
+    # Already backed off in this window: no further decrease, and no increase
+    assert (slot.concurrency, slot.delay) == (2, 2.0)
+    assert crawler.stats.get_value(f'adaptive/{DOMAIN}/backoff_responses') == 2
+
+    respond(ext, status=503)
+    assert (slot.concurrency, slot.delay) == (1, 4.0)
+
+
+def test_limits_are_saved_and_seed_the_next_run(setup, tmp_path):
+    ext, crawler, slot = setup()
+    request = Request(f'https://{DOMAIN}/', meta={'download_slot': DOMAIN})
+    ext.spider_opened(None)
+    ext.request_reached_downloader(request, None)
+    for _ in range(4):
+        respond(ext)
+    ext.spider_closed(None)
+    with open(tmp_path / 'adaptive_limits.json') as f:
+        assert json.load(f) == {DOMAIN: {'concurrency': 5, 'delay': 0.5}}
+
+    ext, _, slot = setup()
+    ext.spider_opened(None)
+    ext.request_reached_downloader(request, None)
+    assert (slot.concurrency, slot.delay) == (5, 0.5)
+
+
+def test_delay_floor_defaults_to_download_delay(setup):
+    ext, _, slot = setup(DOWNLOAD_DELAY=0.75)
+    for _ in range(8):
+        respond(ext)
+    assert (slot.concurrency, slot.delay) == (6, 0.75)
+
+
+def test_delay_floor_follows_the_spider_download_delay(setup):
+    ext, _, slot = setup(DOWNLOAD_DELAY=0.25)
+    ext.spider_opened(SimpleNamespace(download_delay=1.0))
+    for _ in range(8):
+        respond(ext)
+    assert slot.delay == 1.0
+
+
+def test_explicit_min_delay_wins(setup):
+    ext, _, slot = setup(DOWNLOAD_DELAY=1.0, ADAPTIVE_MIN_DELAY=0.25)
+    ext.spider_opened(SimpleNamespace(download_delay=1.0))
+    for _ in range(8):
+        respond(ext)
+    assert slot.delay == 0.25
+
+
+def test_seeded_delay_respects_the_floor(setup, tmp_path):
+    with open(tmp_path / 'adaptive_limits.json', 'w') as f:
+        json.dump({DOMAIN: {'concurrency': 5, 'delay': 0.0}}, f)
+    ext, _, slot = setup(DOWNLOAD_DELAY=1.0)
+    ext.spider_opened(None)
+    ext.request_reached_downloader(Request(f'https://{DOMAIN}/', meta={'download_slot': DOMAIN}), None)
+    assert (slot.concurrency, slot.delay) == (5, 1.0)